@@ -1,7 +1,11 @@
 import spacy
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+import os
 import re
 from collections import defaultdict
+from dataclasses import dataclass, field
+from app.controllers.keyword_matcher import KeywordMatcher
+from app.controllers.analysis_cache import AnalysisCache, analysis_cache
 from app.models.requirements_model import (
     RequirementsAnalysisOutput,
     FunctionalRequirement,
@@ -9,18 +13,217 @@ from app.models.requirements_model import (
     Constraint,
     Entity,
     Relationship,
-    BusinessRule
+    BusinessRule,
+    RequirementsChunkAnalysis,
+    RequirementsStreamSummary
 )
 
-class NLPProcessor:
+SPACY_MODEL = "en_core_web_sm"
+
+# Part of the analysis cache key; bump whenever extraction logic changes so stale results are not served
+NLP_PROCESSOR_VERSION = "1"
+
+# Named pipeline profiles. Each one excludes the components its extractors can do without:
+#   full   - the complete en_core_web_sm pipeline
+#   no-ner - drops the entity recognizer (actors then come from role keywords only)
+#   fast   - tagger + rule-based lemmatizer with a rule-based sentencizer; no parser or NER,
+#            so noun chunks fall back to tag runs and relationships are not extracted
+PIPELINE_PROFILES = {
+    "full": {"exclude": [], "sentencizer": False},
+    "no-ner": {"exclude": ["ner"], "sentencizer": False},
+    "fast": {"exclude": ["parser", "ner", "senter"], "sentencizer": True},
+}
+DEFAULT_PROFILE = os.getenv("NLP_PIPELINE_PROFILE", "full")
+
+METRIC_PATTERN = re.compile(r'\d+\s*(ms|seconds?|%|users?|concurrent)', re.IGNORECASE)
+
+# Defaults for analyze_many; n_process > 1 forks worker processes that each hold a copy of the model.
+# The API keeps n_process at 1: executors.analyze_many spreads a batch over the CPU process pool instead.
+DEFAULT_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "32"))
+DEFAULT_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+
+# Target size of one chunk when streaming the analysis of a large document
+DEFAULT_CHUNK_CHARS = int(os.getenv("NLP_STREAM_CHUNK_CHARS", "20000"))
+
+# Lines such as "3. Non-Functional Requirements", "4.2 Payments" or "SECURITY REQUIREMENTS:"
+SECTION_HEADING = re.compile(r'^\s*(\d+(\.\d+)*[.)]?\s+\S[^\n]{0,80}|[A-Z][A-Z0-9 /&-]{2,80}:?)\s*$')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+FUNCTIONAL_KEYWORDS = ["can", "should", "shall", "will", "able to", "allow", "enable", "provide"]
+RULE_INDICATORS = ["if", "when", "only", "rule", "policy", "unless", "except", "condition"]
+STRONG_CONSTRAINT_KEYWORDS = ["must use", "deployed on", "built with", "powered by"]
+STRONG_COMPLIANCE_STANDARDS = ["gdpr", "hipaa", "pci"]
+HIGH_PRIORITY_WORDS = ["critical", "must", "essential", "required", "shall"]
+MEDIUM_PRIORITY_WORDS = ["should", "important"]
+
+
+@dataclass
+class SentenceFeatures:
+    """Everything the extractors need to know about one sentence of the parsed Doc."""
+    text: str
+    lower: str
+    verb_lemmas: List[str] = field(default_factory=list)
+    hits: Dict[str, set] = field(default_factory=dict)
+    nfr_category: Optional[str] = None
+    constraint_types: List[str] = field(default_factory=list)
+    has_functional_keyword: bool = False
+    has_rule_indicator: bool = False
+    has_metric: bool = False
+    is_strong_constraint: bool = False
+    priority: str = "low"
+
+
+def load_pipeline(profile: str = DEFAULT_PROFILE):
+    """Load the spaCy pipeline for a named profile. Raises if the model package is not installed."""
+    if profile not in PIPELINE_PROFILES:
+        raise ValueError(f"Unknown NLP pipeline profile '{profile}'. Choose one of: {', '.join(PIPELINE_PROFILES)}")
+    
+    if not spacy.util.is_package(SPACY_MODEL):
+        raise RuntimeError(
+            f"spaCy model '{SPACY_MODEL}' is not installed. Install it at build time with "
+            f"'pip install -r requirements.txt' or 'python -m spacy download {SPACY_MODEL}'."
+        )
+    
+    settings = PIPELINE_PROFILES[profile]
+    nlp = spacy.load(SPACY_MODEL, exclude=settings["exclude"])
+    if settings["sentencizer"]:
+        nlp.add_pipe("sentencizer", first=True)
+    return nlp
+
+
+_sentence_splitter = None
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Cheap rule-based sentence split (blank English tokenizer + sentencizer, no model).
+    Used to find which sentences of a follow-up message are new before running the full pipeline.
+    """
+    global _sentence_splitter
+    if _sentence_splitter is None:
+        splitter = spacy.blank("en")
+        splitter.add_pipe("sentencizer")
+        _sentence_splitter = splitter
+    return [sent.text.strip() for sent in _sentence_splitter(text).sents if sent.text.strip()]
+
+
+def _split_oversized(block: str, max_chars: int) -> Iterator[str]:
+    """Split a block longer than max_chars at line, then sentence, then hard character boundaries."""
+    if len(block) <= max_chars:
+        yield block
+        return
+    
+    pieces = block.split("\n") if "\n" in block else SENTENCE_BOUNDARY.split(block)
+    if len(pieces) == 1:
+        for start in range(0, len(block), max_chars):
+            yield block[start:start + max_chars]
+        return
+    
+    current = ""
+    for piece in pieces:
+        for part in _split_oversized(piece, max_chars):
+            if current and len(current) + len(part) + 1 > max_chars:
+                yield current
+                current = ""
+            current = f"{current}\n{part}" if current else part
+    if current:
+        yield current
+
+
+def chunk_text(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Lazily split a large document into chunks of at most max_chars, on paragraph boundaries.
+    A paragraph that looks like a section heading starts a new chunk once the current
+    one is at least half full, so sections tend to stay together.
+    """
+    current = []
+    size = 0
+    
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        
+        for block in _split_oversized(paragraph, max_chars):
+            starts_section = bool(SECTION_HEADING.match(block.split("\n", 1)[0]))
+            if current and (size + len(block) > max_chars or (starts_section and size >= max_chars // 2)):
+                yield "\n\n".join(current)
+                current = []
+                size = 0
+            current.append(block)
+            size += len(block) + 2
+    
+    if current:
+        yield "\n\n".join(current)
+
+
+class ChunkedAnalysis:
+    """
+    Turns per-chunk analysis results into stream events: IDs are renumbered so they
+    continue across chunks, and document-level aggregates are kept for the final summary.
+    """
+    
+    ID_PREFIXES = {
+        "functional_requirements": "FR",
+        "non_functional_requirements": "NFR",
+        "constraints": "C",
+        "business_rules": "BR"
+    }
+    
     def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("Downloading spaCy model...")
-            import subprocess
-            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-            self.nlp = spacy.load("en_core_web_sm")
+        self.counts = {key: 0 for key in self.ID_PREFIXES}
+        self.chunks = 0
+        self.summary = ""
+        self.actors: Dict[str, None] = {}
+        self.technologies: Dict[str, None] = {}
+        self.confidence_total = 0.0
+    
+    def add(self, result: RequirementsAnalysisOutput) -> RequirementsChunkAnalysis:
+        for key, prefix in self.ID_PREFIXES.items():
+            for item in getattr(result, key):
+                self.counts[key] += 1
+                item.id = f"{prefix}{self.counts[key]}"
+        
+        self.summary = self.summary or result.summary
+        self.actors.update(dict.fromkeys(result.actors))
+        self.technologies.update(dict.fromkeys(result.technologies_mentioned))
+        self.confidence_total += result.confidence
+        
+        event = RequirementsChunkAnalysis(
+            chunk_index=self.chunks,
+            functional_requirements=result.functional_requirements,
+            non_functional_requirements=result.non_functional_requirements,
+            constraints=result.constraints,
+            business_rules=result.business_rules,
+            actors=result.actors,
+            entities=result.entities,
+            relationships=result.relationships,
+            technologies_mentioned=result.technologies_mentioned
+        )
+        self.chunks += 1
+        return event
+    
+    def finish(self) -> RequirementsStreamSummary:
+        return RequirementsStreamSummary(
+            chunks=self.chunks,
+            summary=self.summary,
+            actors=sorted(self.actors),
+            technologies_mentioned=sorted(self.technologies),
+            counts=dict(self.counts),
+            confidence=round(self.confidence_total / self.chunks, 4) if self.chunks else 0.0
+        )
+
+
+def analysis_cache_key(requirements_text: str, profile: str = DEFAULT_PROFILE) -> str:
+    """Cache key for an analysis result; depends on the text, processor version and profile."""
+    return AnalysisCache.make_key(requirements_text, f"{NLP_PROCESSOR_VERSION}:{profile}")
+
+
+class NLPProcessor:
+    def __init__(self, profile: str = DEFAULT_PROFILE, cache: Optional[AnalysisCache] = analysis_cache):
+        self.profile = profile
+        self.nlp = load_pipeline(profile)
+        self.cache = cache
         
         self.nfr_patterns = {
             "performance": ["latency", "response time", "throughput", "speed", "fast", "milliseconds", "seconds", "performance"],
@@ -53,18 +256,111 @@ class NLPProcessor:
         self.action_verbs = ["request", "accept", "view", "create", "delete", "update", "add", 
                             "remove", "send", "receive", "book", "cancel", "rate", "review",
                             "search", "filter", "browse", "select", "submit", "approve", "reject"]
+        
+        self.tech_keywords = ["aws", "azure", "gcp", "stripe", "paypal", "react", "angular", "vue", 
+                              "python", "java", "node", "docker", "kubernetes", "mysql", "postgresql", 
+                              "mongodb", "redis", "kafka", "rabbitmq", "graphql", "rest"]
+        
+        # Candidate values per constraint type, checked in list order
+        self.constraint_values = {
+            "technology": ["stripe", "paypal", "aws", "azure", "gcp", "react", "angular", "vue", 
+                           "python", "java", "node", "mysql", "postgresql", "mongodb"],
+            "compliance": ["gdpr", "hipaa", "pci", "sox", "iso"],
+            "deployment": ["aws", "azure", "gcp", "heroku", "vercel", "netlify", "on-premise", "cloud"]
+        }
+        
+        self._compile_keyword_tables()
+
+    def _compile_keyword_tables(self):
+        """
+        Compile every substring keyword table into one matcher so each sentence
+        is scanned once, plus set/dict lookups for the token-level tables.
+        """
+        matcher = KeywordMatcher()
+        for category, keywords in self.nfr_patterns.items():
+            matcher.add_keywords(f"nfr:{category}", keywords)
+        for constraint_type, keywords in self.constraint_keywords.items():
+            matcher.add_keywords(f"constraint:{constraint_type}", keywords)
+        for constraint_type, values in self.constraint_values.items():
+            matcher.add_keywords(f"value:{constraint_type}", values)
+        matcher.add_keywords("functional", FUNCTIONAL_KEYWORDS)
+        # Sentences are matched padded with spaces, so " if " also catches a leading "if "
+        matcher.add_keywords("rule", [f" {indicator} " for indicator in RULE_INDICATORS])
+        matcher.add_keywords("strong", STRONG_CONSTRAINT_KEYWORDS)
+        matcher.add_keywords("strong_standard", STRONG_COMPLIANCE_STANDARDS)
+        matcher.add_keywords("comply", ["comply", "compliant"])
+        matcher.add_keywords("mandatory", ["must", "required"])
+        matcher.add_keywords("priority:high", HIGH_PRIORITY_WORDS)
+        matcher.add_keywords("priority:medium", MEDIUM_PRIORITY_WORDS)
+        matcher.add_keywords("actor:payment", ["payment", "stripe", "paypal"])
+        matcher.add_keywords("actor:payment_service", ["process", "gateway", "service"])
+        matcher.add_keywords("actor:notification", ["notification", "email"])
+        self.keyword_matcher = matcher.build()
+        
+        self._action_verb_set = frozenset(self.action_verbs)
+        self._tech_keyword_set = frozenset(self.tech_keywords)
+        self._relationship_by_verb = {}
+        for rel_type, verbs in self.relationship_verbs.items():
+            for verb in verbs:
+                self._relationship_by_verb.setdefault(verb, rel_type)
 
     def analyze_requirements(self, requirements_text: str, context: str = None) -> RequirementsAnalysisOutput:
-        doc = self.nlp(requirements_text)
+        cached = self._get_cached(requirements_text)
+        if cached is not None:
+            return cached
         
-        summary = self._generate_summary(requirements_text, doc)
-        functional_reqs = self._extract_functional_requirements(doc, requirements_text)
-        non_functional_reqs = self._extract_non_functional_requirements(doc, requirements_text)
-        constraints = self._extract_constraints(doc, requirements_text)
-        actors = self._extract_actors(doc)
+        doc = self.nlp(requirements_text)
+        result = self._analyze_doc(doc, requirements_text)
+        self._store_cached(requirements_text, result)
+        return result
+
+    def analyze_many(
+        self,
+        requirements_texts: List[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        n_process: int = DEFAULT_N_PROCESS
+    ) -> List[RequirementsAnalysisOutput]:
+        """
+        Analyze a batch of requirement documents, streaming them through nlp.pipe.
+        Results are returned in the same order as the input texts.
+        """
+        results = [self._get_cached(text) for text in requirements_texts]
+        pending = [i for i, result in enumerate(results) if result is None]
+        
+        pending_texts = [requirements_texts[i] for i in pending]
+        docs = self.nlp.pipe(pending_texts, batch_size=batch_size, n_process=n_process)
+        for i, doc, text in zip(pending, docs, pending_texts):
+            results[i] = self._analyze_doc(doc, text)
+            self._store_cached(text, results[i])
+        
+        return results
+
+    def _cache_key(self, requirements_text: str) -> str:
+        return analysis_cache_key(requirements_text, self.profile)
+
+    def _get_cached(self, requirements_text: str) -> Optional[RequirementsAnalysisOutput]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(requirements_text))
+        if cached is not None:
+            cached.raw_input = requirements_text
+        return cached
+
+    def _store_cached(self, requirements_text: str, result: RequirementsAnalysisOutput):
+        if self.cache is not None:
+            self.cache.set(self._cache_key(requirements_text), result)
+
+    def _analyze_doc(self, doc, requirements_text: str) -> RequirementsAnalysisOutput:
+        sentences = self._build_sentence_features(doc)
+        
+        summary = self._generate_summary(doc, sentences)
+        functional_reqs = self._extract_functional_requirements(sentences)
+        non_functional_reqs = self._extract_non_functional_requirements(sentences)
+        constraints = self._extract_constraints(sentences)
+        actors = self._extract_actors(doc, sentences)
         entities = self._extract_entities(doc)
         relationships = self._extract_relationships(doc, actors, entities)
-        business_rules = self._extract_business_rules(doc, requirements_text)
+        business_rules = self._extract_business_rules(sentences)
         technologies = self._extract_technologies(doc, requirements_text)
         confidence = self._calculate_confidence(doc, functional_reqs, non_functional_reqs)
         
@@ -82,13 +378,43 @@ class NLPProcessor:
             raw_input=requirements_text
         )
 
-    def _generate_summary(self, text: str, doc) -> str:
-        sentences = [sent.text.strip() for sent in doc.sents]
+    def _build_sentence_features(self, doc) -> List[SentenceFeatures]:
+        """
+        Walk the parsed Doc once and record per-sentence features.
+        Every sentence-level extractor reads from these records instead of
+        re-splitting (or re-parsing) the text on its own.
+        """
+        features = []
+        
+        for sent in doc.sents:
+            text = sent.text.strip()
+            lower = text.lower()
+            hits = self.keyword_matcher.find(f" {lower} ")
+            
+            features.append(SentenceFeatures(
+                text=text,
+                lower=lower,
+                verb_lemmas=[token.lemma_ for token in sent if token.pos_ == "VERB"],
+                hits=hits,
+                nfr_category=next((category for category in self.nfr_patterns if f"nfr:{category}" in hits), None),
+                constraint_types=[
+                    constraint_type for constraint_type in self.constraint_keywords
+                    if f"constraint:{constraint_type}" in hits
+                ],
+                has_functional_keyword="functional" in hits,
+                has_rule_indicator="rule" in hits,
+                has_metric=bool(METRIC_PATTERN.search(lower)),
+                is_strong_constraint="strong" in hits or ("comply" in hits and "strong_standard" in hits),
+                priority="high" if "priority:high" in hits else "medium" if "priority:medium" in hits else "low"
+            ))
         
+        return features
+
+    def _generate_summary(self, doc, sentences: List[SentenceFeatures]) -> str:
         # Take first sentence and key points
         summary_parts = []
         if sentences:
-            summary_parts.append(sentences[0])
+            summary_parts.append(sentences[0].text)
         
         # Add key technologies, constraints
         tech_mentions = []
@@ -101,98 +427,77 @@ class NLPProcessor:
         
         return ". ".join(summary_parts)[:200]
 
-    def _extract_functional_requirements(self, doc, text: str) -> List[FunctionalRequirement]:
+    def _extract_functional_requirements(self, sentences: List[SentenceFeatures]) -> List[FunctionalRequirement]:
         functional_reqs = []
-        sentences = [sent.text.strip() for sent in doc.sents]
-        
-        functional_keywords = ["can", "should", "shall", "will", "able to", "allow", "enable", "provide"]
         
         for sent in sentences:
-            sent_lower = sent.lower()
-            sent_doc = self.nlp(sent)
+            has_action_verb = any(lemma in self._action_verb_set for lemma in sent.verb_lemmas)
+            is_nfr = sent.nfr_category is not None and sent.has_metric
             
-            has_functional_keyword = any(keyword in sent_lower for keyword in functional_keywords)
-            has_action_verb = any(token.lemma_ in self.action_verbs for token in sent_doc if token.pos_ == "VERB")
-            
-            is_nfr = self._has_nfr_with_metric(sent_lower)
-            is_strong_constraint = self._is_strong_constraint(sent_lower)
-            
-            if (has_functional_keyword or has_action_verb) and not is_nfr and not is_strong_constraint:
+            if (sent.has_functional_keyword or has_action_verb) and not is_nfr and not sent.is_strong_constraint:
                 functional_reqs.append(FunctionalRequirement(
                     id=f"FR{len(functional_reqs) + 1}",
-                    text=sent,
-                    priority=self._determine_priority(sent)
+                    text=sent.text,
+                    priority=sent.priority
                 ))
         
         return functional_reqs
 
-    def _extract_non_functional_requirements(self, doc, text: str) -> List[NonFunctionalRequirement]:
+    def _extract_non_functional_requirements(self, sentences: List[SentenceFeatures]) -> List[NonFunctionalRequirement]:
         nfr_list = []
-        sentences = [sent.text.strip() for sent in doc.sents]
         
         for sent in sentences:
-            sent_lower = sent.lower()
-            
-            if self._is_strong_constraint(sent_lower):
+            if sent.is_strong_constraint or not sent.nfr_category:
                 continue
             
-            matched_category = None
-            for category, keywords in self.nfr_patterns.items():
-                if any(keyword in sent_lower for keyword in keywords):
-                    matched_category = category
-                    break
+            value, unit = self._extract_numeric_value(sent.text)
             
-            if matched_category:
-                value, unit = self._extract_numeric_value(sent)
-                
-                nfr_list.append(NonFunctionalRequirement(
-                    id=f"NFR{len(nfr_list) + 1}",
-                    text=sent,
-                    category=matched_category,
-                    value=value,
-                    unit=unit,
-                    priority=self._determine_priority(sent)
-                ))
+            nfr_list.append(NonFunctionalRequirement(
+                id=f"NFR{len(nfr_list) + 1}",
+                text=sent.text,
+                category=sent.nfr_category,
+                value=value,
+                unit=unit,
+                priority=sent.priority
+            ))
         
         return nfr_list
 
-    def _extract_constraints(self, doc, text: str) -> List[Constraint]:
+    def _extract_constraints(self, sentences: List[SentenceFeatures]) -> List[Constraint]:
         constraints = []
-        sentences = [sent.text.strip() for sent in doc.sents]
         
         for sent in sentences:
-            sent_lower = sent.lower()
+            mandatory = "mandatory" in sent.hits
             
             matched = False
-            for constraint_type, keywords in self.constraint_keywords.items():
-                if any(keyword in sent_lower for keyword in keywords):
-                    value = self._extract_constraint_value(sent, constraint_type)
-                    
-                    if value and len(value) > 2 and not value.startswith(sent[:20]):
-                        constraints.append(Constraint(
-                            id=f"C{len(constraints) + 1}",
-                            text=sent,
-                            type=constraint_type,
-                            value=value,
-                            mandatory="must" in sent_lower or "required" in sent_lower
-                        ))
-                        matched = True
-                        break
+            for constraint_type in sent.constraint_types:
+                value = self._extract_constraint_value(sent, constraint_type)
+                
+                if value and len(value) > 2 and not value.startswith(sent.text[:20]):
+                    constraints.append(Constraint(
+                        id=f"C{len(constraints) + 1}",
+                        text=sent.text,
+                        type=constraint_type,
+                        value=value,
+                        mandatory=mandatory
+                    ))
+                    matched = True
+                    break
             
-            if not matched and ("comply" in sent_lower or "compliant" in sent_lower):
+            if not matched and "comply" in sent.hits:
                 compliance_value = self._extract_constraint_value(sent, "compliance")
                 if compliance_value:
                     constraints.append(Constraint(
                         id=f"C{len(constraints) + 1}",
-                        text=sent,
+                        text=sent.text,
                         type="compliance",
                         value=compliance_value,
-                        mandatory="must" in sent_lower or "required" in sent_lower
+                        mandatory=mandatory
                     ))
         
         return constraints
 
-    def _extract_actors(self, doc) -> List[str]:
+    def _extract_actors(self, doc, sentences: List[SentenceFeatures]) -> List[str]:
         actors = set()
         
         for ent in doc.ents:
@@ -212,12 +517,10 @@ class NLPProcessor:
         
         # Add common technical actors
         tech_actors = ["PaymentGateway", "NotificationService", "Database"]
-        for sentence in doc.sents:
-            sent_lower = sentence.text.lower()
-            if ("payment" in sent_lower or "stripe" in sent_lower or "paypal" in sent_lower) and \
-               any(word in sent_lower for word in ["process", "gateway", "service"]):
+        for sentence in sentences:
+            if "actor:payment" in sentence.hits and "actor:payment_service" in sentence.hits:
                 actors.add("PaymentGateway")
-            if "notification" in sent_lower or "email" in sent_lower:
+            if "actor:notification" in sentence.hits:
                 actors.add("NotificationService")
         
         return sorted(list(actors))
@@ -232,9 +535,9 @@ class NLPProcessor:
         
         excluded_entities = ["application", "system", "latency", "processing", "matching"]
         
-        for chunk in doc.noun_chunks:
-            if chunk.root.pos_ == "NOUN":
-                entity_name = chunk.root.text.lower()
+        for chunk, root in self._noun_chunks(doc):
+            if root.pos_ == "NOUN":
+                entity_name = root.text.lower()
                 
                 if entity_name in excluded_entities:
                     continue
@@ -244,7 +547,7 @@ class NLPProcessor:
                     for token in chunk:
                         if token.pos_ == "ADJ" and token.text.lower() not in ["concurrent", "intercity"]:
                             attributes.append(token.text.lower())
-                        elif token.pos_ == "NOUN" and token != chunk.root and token.text.lower() not in excluded_entities:
+                        elif token.pos_ == "NOUN" and token != root and token.text.lower() not in excluded_entities:
                             attributes.append(token.text.lower())
                     
                     final_name = entity_name[:-1] if entity_name.endswith('s') and entity_name[:-1] in domain_keywords else entity_name
@@ -259,8 +562,32 @@ class NLPProcessor:
         
         return entities[:10] 
 
+    def _noun_chunks(self, doc):
+        """
+        Yield (chunk, root) pairs. Uses the parser's noun chunks when the profile has a
+        parser, otherwise runs of adjectives/nouns ending in a noun (root = last noun).
+        """
+        if doc.has_annotation("DEP"):
+            for chunk in doc.noun_chunks:
+                yield chunk, chunk.root
+            return
+        
+        start = None
+        for i, token in enumerate(doc):
+            if token.pos_ in ("ADJ", "NOUN", "PROPN"):
+                if start is None:
+                    start = i
+                if token.pos_ == "NOUN" and (i + 1 == len(doc) or doc[i + 1].pos_ not in ("ADJ", "NOUN", "PROPN")):
+                    yield doc[start:i + 1], token
+            else:
+                start = None
+
     def _extract_relationships(self, doc, actors: List[str], entities: List[Entity]) -> List[Relationship]:
         relationships = []
+        
+        # Subject/object detection needs the dependency parse (not available in the "fast" profile)
+        if not doc.has_annotation("DEP"):
+            return relationships
         entity_names = [e.name for e in entities]
         
         actors_lower = {a.lower(): a for a in actors}
@@ -298,23 +625,14 @@ class NLPProcessor:
         
         return relationships[:15]  
 
-    def _extract_business_rules(self, doc, text: str) -> List[BusinessRule]:
+    def _extract_business_rules(self, sentences: List[SentenceFeatures]) -> List[BusinessRule]:
         rules = []
-        sentences = [sent.text.strip() for sent in doc.sents]
-        
-        rule_indicators = ["if", "when", "only", "rule", "policy", "unless", "except", "condition"]
         
         for sent in sentences:
-            sent_lower = sent.lower()
-            has_rule_indicator = any(f" {indicator} " in f" {sent_lower} " or sent_lower.startswith(indicator + " ") 
-                                    for indicator in rule_indicators)
-            
-            is_strong_constraint = self._is_strong_constraint(sent_lower)
-            
-            if has_rule_indicator and not is_strong_constraint:
+            if sent.has_rule_indicator and not sent.is_strong_constraint:
                 rules.append(BusinessRule(
                     id=f"BR{len(rules) + 1}",
-                    text=sent,
+                    text=sent.text,
                     category="business_logic"
                 ))
         
@@ -322,12 +640,9 @@ class NLPProcessor:
 
     def _extract_technologies(self, doc, text: str) -> List[str]:
         technologies = set()
-        tech_keywords = ["aws", "azure", "gcp", "stripe", "paypal", "react", "angular", "vue", 
-                        "python", "java", "node", "docker", "kubernetes", "mysql", "postgresql", 
-                        "mongodb", "redis", "kafka", "rabbitmq", "graphql", "rest"]
         
         for token in doc:
-            if token.text.lower() in tech_keywords:
+            if token.text.lower() in self._tech_keyword_set:
                 technologies.add(token.text.upper() if token.text.lower() in ["aws", "gcp", "api"] else token.text.capitalize())
         
         return sorted(list(technologies))
@@ -347,56 +662,19 @@ class NLPProcessor:
         
         return None, None
 
-    def _extract_constraint_value(self, text: str, constraint_type: str) -> str:
-        text_lower = text.lower()
-        
-        if constraint_type == "technology":
-            tech_names = ["stripe", "paypal", "aws", "azure", "gcp", "react", "angular", "vue", 
-                         "python", "java", "node", "mysql", "postgresql", "mongodb"]
-            for tech in tech_names:
-                if tech in text_lower:
-                    return tech.upper() if tech in ["aws", "gcp"] else tech.capitalize()
+    def _extract_constraint_value(self, sent: SentenceFeatures, constraint_type: str) -> str:
+        found = sent.hits.get(f"value:{constraint_type}")
+        if not found:
+            return None
         
-        elif constraint_type == "compliance":
-            compliance_standards = ["gdpr", "hipaa", "pci", "sox", "iso"]
-            for standard in compliance_standards:
-                if standard in text_lower:
-                    return standard.upper()
-        
-        elif constraint_type == "deployment":
-            platforms = ["aws", "azure", "gcp", "heroku", "vercel", "netlify", "on-premise", "cloud"]
-            for platform in platforms:
-                if platform in text_lower:
-                    return platform.upper() if platform in ["aws", "gcp"] else platform.capitalize()
+        for candidate in self.constraint_values.get(constraint_type, []):
+            if candidate in found:
+                return candidate.upper() if candidate in ["aws", "gcp"] or constraint_type == "compliance" else candidate.capitalize()
         
         return None
 
-    def _has_nfr_with_metric(self, text: str) -> bool:
-        has_nfr_keyword = any(keyword in text for category in self.nfr_patterns.values() for keyword in category)
-        has_metric = bool(re.search(r'\d+\s*(ms|seconds?|%|users?|concurrent)', text, re.IGNORECASE))
-        return has_nfr_keyword and has_metric
-
-    def _is_strong_constraint(self, text: str) -> bool:
-        return any(keyword in text for keyword in ["must use", "deployed on", "built with", "powered by"]) or \
-               (("comply" in text or "compliant" in text) and any(std in text for std in ["gdpr", "hipaa", "pci"]))
-
-    def _is_constraint_sentence(self, text: str) -> bool:
-        return self._is_strong_constraint(text)
-
-    def _determine_priority(self, text: str) -> str:
-        text_lower = text.lower()
-        if any(word in text_lower for word in ["critical", "must", "essential", "required", "shall"]):
-            return "high"
-        elif any(word in text_lower for word in ["should", "important"]):
-            return "medium"
-        else:
-            return "low"
-
     def _determine_relationship_type(self, verb: str) -> str:
-        for rel_type, verbs in self.relationship_verbs.items():
-            if verb in verbs:
-                return rel_type
-        return "interacts_with"
+        return self._relationship_by_verb.get(verb, "interacts_with")
 
     def _calculate_confidence(self, doc, functional_reqs: List, non_functional_reqs: List) -> float:
         score = 0.5 
@@ -412,4 +690,19 @@ class NLPProcessor:
         if any(token.like_num for token in doc):
             score += 0.05
         
-        return min(score, 1.0)
\ No newline at end of file
+        return min(score, 1.0)
+
+
+if __name__ == "__main__":
+    # Build-time check: fail the image build instead of the first request if a profile cannot load
+    import sys
+    
+    failed = False
+    for profile_name in PIPELINE_PROFILES:
+        try:
+            pipeline = load_pipeline(profile_name)
+            print(f"{profile_name}: {', '.join(pipeline.pipe_names)}")
+        except Exception as e:
+            print(f"{profile_name}: FAILED - {e}")
+            failed = True
+    sys.exit(1 if failed else 0)
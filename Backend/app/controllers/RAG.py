@@ -1,52 +1,134 @@
+import asyncio
 import json
 import os
-from neo4j import GraphDatabase
+from typing import AsyncIterator, List, Optional, Tuple
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
 from dotenv import load_dotenv
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import google.generativeai as genai
 
+from app.controllers import embedding_store, ann_index, executors
+from app.controllers.dkb_index import ConceptIndex
+from app.controllers.dkb_result_cache import DKB_RESULT_CACHE_ENABLED, dkb_result_cache
+from app.controllers.dkb_snapshot import CYPHER_RANKING_QUERY, DKBSnapshot, dkb_snapshot
+from app.controllers.embedding_cache import embedding_cache
+from app.controllers.embedding_backend import EMBEDDING_MODEL_NAME, load_encoder
+from app.controllers.embedding_batcher import EmbeddingBatcher, EMBEDDING_BATCHING
+from app.controllers.neo4j_pool import AsyncNeo4jPool
+from app.controllers.registry import Resource, ResourceUnavailable, register_resource
+from app.controllers.singleflight import SingleFlight, request_key
+from app.controllers.synthesis_cache import SYNTHESIS_CACHE_ENABLED, SYNTHESIS_CACHE_SEMANTIC, synthesis_cache
+
 load_dotenv()
 URI = os.getenv("NEO4J_URI")
 USER = os.getenv("NEO4J_USER")
 PASS = os.getenv("NEO4J_PASSWORD")
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
+# Rank patterns on the in-memory DKB snapshot instead of a Cypher query per request
+DKB_SNAPSHOT_ENABLED = os.getenv("DKB_SNAPSHOT", "true").lower() == "true"
+# Session context the context routes attach to the NLP JSON (part of the synthesis prompt)
+SESSION_CONTEXT_FIELDS = ("llm_context", "conversation_history")
+
 
-if GEMINI_KEY:
+# --- Resources (initialized on first use or by warmup() from the app lifespan) ---
+
+def _load_gemini():
+    if not GEMINI_KEY:
+        raise RuntimeError("GEMINI_API_KEY not found in .env file")
     genai.configure(api_key=GEMINI_KEY)
-    print("Gemini API configured.")
-else:
-    print("Warning: GEMINI_API_KEY not found in .env file. API calls will fail.")
-
-try:
-    driver = GraphDatabase.driver(URI, auth=(USER, PASS))
-    driver.verify_connectivity()
-    print("Neo4j connection successful.")
-except Exception as e:
-    print(f"Error: Could not connect to Neo4j. {e}")
-    driver = None
-
-try:
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+
+def _load_embedding_model():
+    # Backend (torch / onnx / onnx-int8) is chosen by EMBEDDING_BACKEND; torch is imported only when used
     print("Loading sentence-transformer model...")
-    embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+    encoder = load_encoder()
+    print(f"Embedding backend: {encoder.backend}")
+    # Concurrent requests share forward passes through the batcher's worker thread
+    return EmbeddingBatcher(encoder) if EMBEDDING_BATCHING else encoder
 
-    ROOT = os.path.dirname(os.path.abspath(__file__))
-    json_path = os.path.join(ROOT, "dkb_embeddings.json")
 
-    print(f"Loading DKB embeddings from {json_path}...")
-    with open(json_path, "r") as f:
-        dkb_data = json.load(f)
+def _close_embedding_model(model):
+    if isinstance(model, EmbeddingBatcher):
+        model.close()
 
-    dkb_concepts = dkb_data['concepts']
-    dkb_embeddings_matrix = np.array(dkb_data['embeddings'])
 
-    print(f"Successfully loaded {len(dkb_concepts)} DKB concepts.")
+def _load_dkb_index() -> ConceptIndex:
+    print(f"Loading DKB embeddings from {embedding_store.STORE_DIR}...")
+    try:
+        dkb_store = embedding_store.load_store()
+    except FileNotFoundError as e:
+        raise RuntimeError(f"{e}. Run create_embedding.py to generate dkb_embeddings.npy.") from e
+    if dkb_store.model_name and dkb_store.model_name != EMBEDDING_MODEL_NAME:
+        print(f"Warning: DKB embeddings were built with '{dkb_store.model_name}', "
+              f"queries use '{EMBEDDING_MODEL_NAME}'. Re-run create_embedding.py.")
+
+    dkb_ann = ann_index.IVFIndex.load() if ann_index.ANN_ENABLED else None
+    if dkb_ann is not None and not dkb_ann.matches(dkb_store):
+        print("Warning: ANN index is out of date with the DKB embeddings; using exact search. Re-run create_embedding.py.")
+        dkb_ann = None
+
+    # The memory-mapped matrix is normalized once here; Stage 1 scores snippets with a single matrix multiply
+    dkb_index = ConceptIndex.from_store(
+        dkb_store,
+        ann=dkb_ann,
+        nprobe=ann_index.DEFAULT_NPROBE,
+        ann_min_concepts=ann_index.ANN_MIN_CONCEPTS
+    )
+    if dkb_index.uses_ann:
+        print(f"Using IVF index for DKB search ({dkb_ann.n_lists} lists, nprobe={dkb_index.nprobe}).")
+    print(f"Successfully loaded {len(dkb_index)} DKB concepts.")
+    return dkb_index
+
+
+gemini_model = Resource("gemini", _load_gemini)
+embedding_model = Resource("embedding_model", _load_embedding_model, closer=_close_embedding_model)
+dkb_index = Resource("dkb_index", _load_dkb_index)
+# Async driver used by the request path; reported by /ready like the resources above
+neo4j_async = AsyncNeo4jPool(URI, USER, PASS)
+register_resource(neo4j_async)
+# Identical recommendation requests in flight at the same time share one pipeline run
+recommendation_flight = SingleFlight("RAG")
+
+
+def warmup():
+    """Initialize every RAG resource now instead of on the first request. Failures are logged, not raised."""
+    for resource in (dkb_index, embedding_model, gemini_model):
+        try:
+            resource.get()
+        except ResourceUnavailable:
+            pass
+
+
+async def warmup_async():
+    """warmup() in the blocking I/O pool, then a connectivity check of the async Neo4j pool."""
+    await executors.run_blocking_io(warmup)
+    try:
+        await neo4j_async.verify()
+    except Exception:
+        pass
+
 
-except FileNotFoundError:
-    print("Error: dkb_embeddings.json not found.")
-    print("Expected path:", json_path)
-    dkb_concepts = None
+def close():
+    embedding_model.reset(reason="shut down")
+
+
+async def close_async():
+    await neo4j_async.close()
+
+
+def metrics() -> dict:
+    """Pool and cache counters for the recommendation path."""
+    model = embedding_model.get() if embedding_model.state == "ready" else None
+    return {
+        "neo4j_pool": neo4j_async.metrics(),
+        "dkb_result_cache": dkb_result_cache.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "synthesis_cache": synthesis_cache.stats() if SYNTHESIS_CACHE_ENABLED else None,
+        "single_flight": recommendation_flight.stats(),
+        "embedding_batcher": model.stats() if isinstance(model, EmbeddingBatcher) else None
+    }
 
 
 
@@ -101,21 +183,14 @@ except FileNotFoundError:
 
 def _stage_1_mapper_embedding(nlp_json: dict) -> dict:
     print("\n[Stage 1] Starting Hybrid Mapping (Vector + Keyword)...")
+    index = dkb_index.get()
+    model = embedding_model.get()
     
     # 1. LOWER THRESHOLD significantly for testing
     MIN_SIMILARITY_THRESHOLD = 0.25 
+    TOP_K = 3
     
-    # 2. ROBUST MAPPING (Map your DKB labels to the 3 output keys)
-    LABEL_MAPPING = {
-        "nfr": "nfrs",
-        "quality_attribute": "nfrs",
-        "quality": "nfrs",
-        "constraint": "constraints",
-        "technical_constraint": "constraints",
-        "domain": "domains",
-        "industry": "domains",
-        "system_type": "domains"
-    }
+    # 2. ROBUST MAPPING: DKB labels -> the 3 output keys (LABEL_MAPPING in dkb_index)
 
     mapped_inputs = {"nfrs": set(), "constraints": set(), "domains": set()}
     
@@ -134,110 +209,85 @@ def _stage_1_mapper_embedding(nlp_json: dict) -> dict:
         return {k: list(v) for k, v in mapped_inputs.items()}
 
     # --- STRATEGY A: Exact Keyword Match (The Safety Net) ---
-    print(f"Scanning {len(texts_to_map)} text snippets against {len(dkb_concepts)} concepts...")
+    print(f"Scanning {len(texts_to_map)} text snippets against {len(index)} concepts...")
     
-    for concept in dkb_concepts:
-        c_name = concept["name"].lower()
-        c_label = concept.get("label", "").lower()
-        target_bucket = LABEL_MAPPING.get(c_label)
-        
-        if target_bucket:
-            for text in texts_to_map:
-                # specific check: is the concept name inside the user text?
-                if c_name in text.lower(): 
-                    print(f"  [Keyword Match] Found '{c_name}' in text.")
-                    mapped_inputs[target_bucket].add(concept["name"])
+    for target_bucket, names in index.keyword_matches(texts_to_map).items():
+        for name in names:
+            print(f"  [Keyword Match] Found '{name.lower()}' in text.")
+        mapped_inputs[target_bucket].update(names)
 
     # --- STRATEGY B: Semantic Vector Search ---
-    user_embeddings = embedding_model.encode(texts_to_map)
-    similarity_matrix = cosine_similarity(user_embeddings, dkb_embeddings_matrix)
+    # Only snippets not seen before (by normalized text) reach the model
+    user_embeddings = embedding_cache.encode(texts_to_map, model.encode, model.fingerprint)
+    top_indices, top_scores = index.top_k(user_embeddings, k=TOP_K)
+    accepted = (top_scores >= MIN_SIMILARITY_THRESHOLD) & index.mappable[top_indices]
 
     for i, text in enumerate(texts_to_map):
-        # Get top 3 matches for this sentence to see what's going on
-        top_3_indices = np.argsort(similarity_matrix[i])[-3:][::-1]
-        
+        # Top matches for this sentence to see what's going on
         print(f"\nAnalyzing snippet: '{text[:40]}...'")
         
-        for idx in top_3_indices:
-            score = similarity_matrix[i][idx]
-            concept = dkb_concepts[idx]
-            name = concept["name"]
-            label = concept.get("label", "").lower()
-            
+        for idx, score, keep in zip(top_indices[i], top_scores[i], accepted[i]):
             # Debug Print: Show us what the model THINKS is similar
-            print(f"   - Candidate: {name} ({label}) | Score: {score:.4f}")
+            print(f"   - Candidate: {index.names[idx]} ({index.labels[idx]}) | Score: {score:.4f}")
 
-            if score >= MIN_SIMILARITY_THRESHOLD:
-                target_bucket = LABEL_MAPPING.get(label)
-                if target_bucket:
-                    mapped_inputs[target_bucket].add(name)
-                    print(f"     -> ADDED to {target_bucket}")
+            if keep:
+                target_bucket = index.buckets[idx]
+                mapped_inputs[target_bucket].add(index.names[idx])
+                print(f"     -> ADDED to {target_bucket}")
 
     final_map = {k: list(v) for k, v in mapped_inputs.items()}
     print(f"\n[Stage 1] Final Mapped inputs: {final_map}")
     return final_map
 
-def _stage_2_dkb_query(session, mapped_inputs: dict) -> dict:
+def _stage_2_dkb_query(mapped_inputs: dict, snapshot: DKBSnapshot) -> dict:
     print("[Stage 2] DKB Query running (Weighted Scoring Strategy)...")
     
-    nfrs = mapped_inputs.get("nfrs", [])
-    constraints = mapped_inputs.get("constraints", [])
-    domains = mapped_inputs.get("domains", [])
-    
-    # FIX: This query calculates a score instead of filtering out options.
-    # It rewards matches (+ points) and penalizes conflicts (- points).
-    ranking_query = """
-    WITH $nfrs AS nfrs, $constraints AS constraints, $domains AS domains
-    MATCH (p:Pattern)
-    WITH p, p.cost AS baseCost, nfrs, constraints, domains
-
-    // 1. Score NFRs (Promotes = +2, Hinders = -5)
-    OPTIONAL MATCH (p)-[:PROMOTES]->(n:NFR) WHERE n.name IN nfrs
-    WITH p, baseCost, nfrs, constraints, domains, count(n) * 2 AS promoteScore
-
-    OPTIONAL MATCH (p)-[:HINDERS]->(n:NFR) WHERE n.name IN nfrs
-    WITH p, baseCost, nfrs, constraints, domains, promoteScore, count(n) * 5 AS hinderScore
-
-    // 2. Score Domains (+1 point)
-    OPTIONAL MATCH (p)-[:SUITS]->(d:Domain) WHERE d.name IN domains
-    WITH p, baseCost, nfrs, constraints, domains, promoteScore, hinderScore, count(d) AS domainScore
-         
-    // 3. Score Constraints (+3 points for meeting a constraint)
-    // We removed the strict 'WHERE' clause. Now we just add to the score.
-    OPTIONAL MATCH (p)-[:MEETS_CONSTRAINT]->(c:Constraint) WHERE c.name IN constraints
-    WITH p, baseCost, promoteScore, hinderScore, domainScore, count(c) * 3 AS constraintScore
-
-    // Calculate Final Fit Score
-    // Formula: (Benefits) - (Drawbacks)
-    WITH p, baseCost, (promoteScore + domainScore + constraintScore - hinderScore) AS fitScore
-
-    RETURN 
-        p.name AS pattern, 
-        p.description AS description,
-        fitScore,
-        baseCost
-    
-    // Order by Fit Score first (Highest wins). 
-    // If scores are tied, cheaper implementation wins (baseCost ASC).
-    ORDER BY fitScore DESC, baseCost ASC
-    """
-    
-    parameters = {"nfrs": nfrs, "constraints": constraints, "domains": domains}
-    result = session.run(ranking_query, parameters)
-    ranked_patterns = [record.data() for record in result]
+    # Weighted scoring (promotes +2, hinders -5, domain +1, constraint +3) on the in-memory DKB snapshot
+    ranked_patterns = snapshot.rank(_ranking_parameters(mapped_inputs))
 
+    if not _log_ranking(ranked_patterns):
+        return {"ranked_patterns": [], "top_choice_stack": None}
+
+    # Precomputed for every pattern when the snapshot was loaded
+    tech_stack = snapshot.tech_stack(ranked_patterns[0]["pattern"])
+    return _stage_2_result(ranked_patterns, tech_stack)
+
+
+async def _stage_2_dkb_query_async(session, mapped_inputs: dict) -> dict:
+    """Same scoring computed by Neo4j (DKB_SNAPSHOT=false), on an async session."""
+    print("[Stage 2] DKB Query running (Weighted Scoring Strategy)...")
+    result = await session.run(CYPHER_RANKING_QUERY, _ranking_parameters(mapped_inputs))
+    ranked_patterns = await result.data()
+
+    if not _log_ranking(ranked_patterns):
+        return {"ranked_patterns": [], "top_choice_stack": None}
+
+    result = await session.run(TECH_STACK_QUERY, {"pattern_name": ranked_patterns[0]["pattern"]})
+    tech_stack = {record["component_type"]: record["alternatives"] for record in await result.data()}
+    return _stage_2_result(ranked_patterns, tech_stack)
+
+
+def _ranking_parameters(mapped_inputs: dict) -> dict:
+    return {
+        "nfrs": mapped_inputs.get("nfrs", []),
+        "constraints": mapped_inputs.get("constraints", []),
+        "domains": mapped_inputs.get("domains", [])
+    }
+
+
+def _log_ranking(ranked_patterns: list) -> bool:
     # Debug Print: Show the top candidates and their scores
     if ranked_patterns:
         print(f"  [Ranking] Top 3 Candidates:")
         for i, r in enumerate(ranked_patterns[:3]):
             print(f"    {i+1}. {r['pattern']} (Score: {r['fitScore']}, Cost: {r['baseCost']})")
-    else:
-        print("[Stage 2] No patterns found in database (Graph might be empty).")
-        return {"ranked_patterns": [], "top_choice_stack": None}
+        return True
+    print("[Stage 2] No patterns found in database (Graph might be empty).")
+    return False
+
 
+def _stage_2_result(ranked_patterns: list, tech_stack: dict) -> dict:
     top_pattern_name = ranked_patterns[0]["pattern"]
-    tech_stack = _get_tech_stack_for_pattern(session, top_pattern_name)
-    
     print(f"[Stage 2] Top choice identified: {top_pattern_name}")
     
     return {
@@ -248,8 +298,8 @@ def _stage_2_dkb_query(session, mapped_inputs: dict) -> dict:
         }
     }
 
-def _get_tech_stack_for_pattern(session, pattern_name: str) -> dict:
-    query = """
+
+TECH_STACK_QUERY = """
     MATCH (p:Pattern {name: $pattern_name})-[:REQUIRES]->(ct:ComponentType)
     OPTIONAL MATCH (ct)<-[:IS_A]-(c:Component)
     RETURN ct.name AS component_type, 
@@ -260,27 +310,9 @@ def _get_tech_stack_for_pattern(session, pattern_name: str) -> dict:
              tags: c.tags
            }) AS alternatives
     """
-    result = session.run(query, {"pattern_name": pattern_name})
-    
-    tech_stack = {}
-    for record in result:
-        tech_stack[record["component_type"]] = record["alternatives"]
-        
-    return tech_stack
-
-
-def stage_3_call_gemini_api(nlp_json: dict, dkb_results: dict) -> str:
-    print("[Stage 3] Calling Gemini API for synthesis...")
-    
-    if not GEMINI_KEY:
-        return "Error: GEMINI_API_KEY is not set. Cannot call the API."
 
-    try:
-        model = genai.GenerativeModel('gemini-2.5-pro') 
-    except Exception as e:
-        print(f"Error initializing Gemini model: {e}")
-        return f"Error: Could not initialize Gemini model. {e}"
 
+def _build_synthesis_prompt(nlp_json: dict, dkb_results: dict) -> str:
     nlp_json_str = json.dumps(nlp_json, indent=2)
     dkb_results_str = json.dumps(dkb_results, indent=2)
 
@@ -442,33 +474,212 @@ Use polished technical language appropriate for senior architects.
 The output should feel like a real consulting report.
 
 """
+    return final_prompt_to_gemini
+
 
+class SynthesisFailed(RuntimeError):
+    """Stage 3 could not produce a report; str(error) is the message returned to the user."""
+
+
+def _synthesis_model():
+    if not GEMINI_KEY:
+        raise SynthesisFailed("Error: GEMINI_API_KEY is not set. Cannot call the API.")
     try:
-        response = model.generate_content(final_prompt_to_gemini)
-        return response.text
+        return gemini_model.get()
+    except ResourceUnavailable as e:
+        print(f"Error initializing Gemini model: {e}")
+        raise SynthesisFailed(f"Error: Could not initialize Gemini model. {e}") from e
+
+
+async def _stream_gemini(final_prompt_to_gemini: str) -> AsyncIterator[str]:
+    """Report text chunk by chunk as Gemini generates it; raises SynthesisFailed, also mid-stream."""
+    model = _synthesis_model()
+
+    try:
+        response = await model.generate_content_async(final_prompt_to_gemini, stream=True)
+        async for chunk in response:
+            # Chunks without text parts (e.g. the final one carrying only usage metadata) are skipped
+            text = chunk.text if chunk.parts else ""
+            if text:
+                yield text
     except Exception as e:
         print(f"Error during Gemini API call: {e}")
-        return f"Error: The API call to Gemini failed. {e}"
+        raise SynthesisFailed(f"Error: The API call to Gemini failed. {e}") from e
 
 
-def get_architecture_recommendation(nlp_json_input: dict) -> str:
-    if driver is None or dkb_concepts is None:
-        return "Error: System is not initialized. Check Neo4j connection and 'dkb_embeddings.json' file."
-        
+async def stage_3_call_gemini_api_async(nlp_json: dict, dkb_results: dict, prompt: Optional[str] = None) -> str:
+    """
+    Stage 3 on the async client: the whole report, or raises SynthesisFailed
+    (never a partial report). prompt is the synthesis prompt, if already built.
+    """
+    print("[Stage 3] Calling Gemini API for synthesis...")
+    prompt = prompt or _build_synthesis_prompt(nlp_json, dkb_results)
+    return "".join([chunk async for chunk in _stream_gemini(prompt)])
+
+
+def _requirement_texts(nlp_json: dict) -> List[str]:
+    """Texts of the functional requirements, non-functional requirements and constraints, in order."""
+    texts = []
+    for field in ("functional_requirements", "non_functional_requirements", "constraints"):
+        for item in nlp_json.get(field) or []:
+            if item.get("text"):
+                texts.append(item["text"])
+    return texts
+
+
+def _cached_synthesis(prompt: str, nlp_json: dict, dkb_results: dict) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    (cached report or None, keys to store a fresh report under). The exact key
+    hashes the prompt sent to Gemini. Blocking: with SYNTHESIS_CACHE_SEMANTIC the
+    semantic key embeds every requirement text.
+    """
+    if not SYNTHESIS_CACHE_ENABLED:
+        return None, None
+
+    keys = {"exact_key": synthesis_cache.exact_key(prompt, GEMINI_MODEL)}
+    try:
+        requirements = "\n".join(_requirement_texts(nlp_json))
+        if SYNTHESIS_CACHE_SEMANTIC and requirements:
+            model = embedding_model.get()
+            vector = embedding_cache.encode([requirements], model.encode, model.fingerprint)[0]
+            # Session context is part of the prompt, so only reports written for the same context can match
+            session_context = {field: nlp_json.get(field) for field in SESSION_CONTEXT_FIELDS}
+            keys["semantic_key"] = synthesis_cache.semantic_key(dkb_results, session_context, GEMINI_MODEL, model.fingerprint)
+            keys["requirements_vector"] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        cached = synthesis_cache.get(**keys)
+    except Exception as e:
+        print(f"Warning: synthesis cache lookup failed. {e}")
+        return None, None
+    if cached is not None:
+        print("[Stage 3] Using cached synthesis.")
+    return cached, keys
+
+
+def _store_synthesis(keys: Optional[dict], report: str):
+    # Only called with complete reports: a failed Stage 3 raises SynthesisFailed before reaching here
+    if keys is None or not report:
+        return
+    try:
+        synthesis_cache.set(response=report, **keys)
+    except Exception as e:
+        print(f"Warning: could not store synthesis in cache. {e}")
+
+
+def _cached_dkb_results(version: Optional[str], mapped_inputs: dict) -> Optional[dict]:
+    """Stage 2 result memoized for the same concept sets on the same DKB version (DKB_RESULT_CACHE)."""
+    if version is None or not DKB_RESULT_CACHE_ENABLED:
+        return None
+    cached = dkb_result_cache.get(version, mapped_inputs)
+    if cached is not None:
+        print(f"[Stage 2] Cached result for this concept signature (DKB version {version}).")
+    return cached
+
+
+async def _run_dkb_query_async(mapped_inputs: dict) -> dict:
+    """Stage 2 with one reconnect: a dropped Neo4j connection resets the pool and the query is retried."""
+    for attempt in range(2):
+        try:
+            if DKB_SNAPSHOT_ENABLED:
+                snapshot = await dkb_snapshot.get_async(neo4j_async)
+                version = snapshot.version
+            else:
+                version = await dkb_result_cache.version_async(neo4j_async) if DKB_RESULT_CACHE_ENABLED else None
+
+            cached = _cached_dkb_results(version, mapped_inputs)
+            if cached is not None:
+                return cached
+            if DKB_SNAPSHOT_ENABLED:
+                dkb_results = _stage_2_dkb_query(mapped_inputs, snapshot)
+            else:
+                async with neo4j_async.session() as session:
+                    dkb_results = await _stage_2_dkb_query_async(session, mapped_inputs)
+            if version is not None and DKB_RESULT_CACHE_ENABLED:
+                dkb_result_cache.put(version, mapped_inputs, dkb_results)
+            return dkb_results
+        except (ServiceUnavailable, SessionExpired) as e:
+            print(f"Neo4j connection lost ({e}); reconnecting...")
+            await neo4j_async.reset(reason=str(e))
+            if attempt == 1:
+                raise ResourceUnavailable(f"neo4j is unavailable: {e}") from e
+
+
+async def _retrieve_async(nlp_json_input: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Stages 1 and 2 for the async entry points. Returns (dkb_results, None), or
+    (None, message) when the request ends before synthesis.
+    """
+    try:
+        dkb_index.get()
+    except ResourceUnavailable as e:
+        return None, f"Error: System is not initialized. Check Neo4j connection and the DKB embedding store (dkb_embeddings.npy). {e}"
+
     print(f"\n===== New Request: '{nlp_json_input.get('summary', 'N/A')}' =====")
-    
-    mapped_inputs = _stage_1_mapper_embedding(nlp_json_input)
-    
-    with driver.session() as session:
-        dkb_results = _stage_2_dkb_query(session, mapped_inputs)
-    
+
+    try:
+        # Stage 1 runs model inference, so it stays in the blocking I/O pool
+        mapped_inputs = await executors.run_blocking_io(_stage_1_mapper_embedding, nlp_json_input)
+        dkb_results = await _run_dkb_query_async(mapped_inputs)
+    except ResourceUnavailable as e:
+        return None, f"Error: System is not initialized. {e}"
+    except (ServiceUnavailable, asyncio.TimeoutError) as e:
+        return None, f"Error: System is not initialized. Check Neo4j connection. {e}"
+
     if not dkb_results["ranked_patterns"]:
-        return "I'm sorry, but no architectural patterns in our knowledge base fit your specific constraints. You may need to relax some of your requirements."
-        
-    final_answer = stage_3_call_gemini_api(
-        nlp_json=nlp_json_input,
-        dkb_results=dkb_results
+        return None, "I'm sorry, but no architectural patterns in our knowledge base fit your specific constraints. You may need to relax some of your requirements."
+    return dkb_results, None
+
+
+async def get_architecture_recommendation_async(nlp_json_input: dict) -> str:
+    """
+    Full pipeline for route handlers: Neo4j and Gemini are awaited on the
+    event loop, Stage 1 runs in the blocking I/O pool. Concurrent
+    calls with the same (normalized) input share a single pipeline run.
+    """
+    # Keyed on the whole input: session context fields end up in the Gemini prompt too
+    return await recommendation_flight.do(
+        request_key(nlp_json_input),
+        lambda: _get_architecture_recommendation_async(nlp_json_input)
     )
-    
-    return final_answer
 
+
+async def _get_architecture_recommendation_async(nlp_json_input: dict) -> str:
+    dkb_results, message = await _retrieve_async(nlp_json_input)
+    if message is not None:
+        return message
+
+    prompt = _build_synthesis_prompt(nlp_json_input, dkb_results)
+    cached, cache_keys = await executors.run_blocking_io(_cached_synthesis, prompt, nlp_json_input, dkb_results)
+    if cached is not None:
+        return cached
+    try:
+        report = await stage_3_call_gemini_api_async(nlp_json_input, dkb_results, prompt=prompt)
+    except SynthesisFailed as e:
+        return str(e)
+    await executors.run_blocking_io(_store_synthesis, cache_keys, report)
+    return report
+
+
+async def stream_architecture_recommendation(nlp_json_input: dict) -> AsyncIterator[str]:
+    """Like get_architecture_recommendation_async, but yields the report as Gemini streams it."""
+    dkb_results, message = await _retrieve_async(nlp_json_input)
+    if message is not None:
+        yield message
+        return
+
+    prompt = _build_synthesis_prompt(nlp_json_input, dkb_results)
+    cached, cache_keys = await executors.run_blocking_io(_cached_synthesis, prompt, nlp_json_input, dkb_results)
+    if cached is not None:
+        yield cached
+        return
+
+    print("[Stage 3] Streaming Gemini API synthesis...")
+    chunks = []
+    try:
+        async for chunk in _stream_gemini(prompt):
+            chunks.append(chunk)
+            yield chunk
+    except SynthesisFailed as e:
+        # Chunks already sent cannot be taken back: the error ends the stream and nothing is cached
+        yield str(e)
+        return
+    await executors.run_blocking_io(_store_synthesis, cache_keys, "".join(chunks))
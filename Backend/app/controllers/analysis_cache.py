@@ -0,0 +1,133 @@
+"""
+Content-addressed cache for NLP analysis results.
+Entries are keyed by a hash of the normalized requirements text plus a namespace
+(processor version and pipeline profile), held in a bounded in-memory LRU with TTL
+and optionally mirrored to a directory on disk so they survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from cachetools import TTLCache
+
+from app.models.requirements_model import RequirementsAnalysisOutput
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially reformatted prompts share a cache entry."""
+    return " ".join((text or "").split())
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 3600, disk_dir: Optional[str] = None):
+        """
+        Args:
+            max_entries: Maximum number of results kept in memory (least recently used are evicted)
+            ttl_seconds: Seconds before an entry expires, in memory and on disk
+            disk_dir: Optional directory for the on-disk tier; disabled when None
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._memory = TTLCache(maxsize=max(max_entries, 1), ttl=ttl_seconds)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(requirements_text: str, namespace: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(requirements_text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[RequirementsAnalysisOutput]:
+        """Return a copy of the cached result, or None on a miss."""
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._stats["hits"] += 1
+                return result.model_copy(deep=True)
+
+        result = self._read_disk(key)
+
+        with self._lock:
+            if result is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            if self.max_entries > 0:
+                self._memory[key] = result
+        return result.model_copy(deep=True)
+
+    def set(self, key: str, result: RequirementsAnalysisOutput):
+        stored = result.model_copy(deep=True)
+        with self._lock:
+            if self.max_entries > 0:
+                self._memory[key] = stored
+            self._stats["stores"] += 1
+        self._write_disk(key, stored)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round((self._stats["hits"] + self._stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+                "size": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": bool(self.disk_dir)
+            }
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[RequirementsAnalysisOutput]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return RequirementsAnalysisOutput(**json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, result: RequirementsAnalysisOutput):
+        if not self.disk_dir:
+            return
+        tmp_path = None
+        try:
+            # A unique temp file per write: threads and processes storing the same key never share one
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.disk_dir, prefix=f"{key}.",
+                                             suffix=".tmp", delete=False) as f:
+                tmp_path = f.name
+                f.write(result.model_dump_json())
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            print(f"Warning: could not write analysis cache entry to disk. {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# Global analysis cache instance
+analysis_cache = AnalysisCache(
+    max_entries=int(os.getenv("NLP_CACHE_SIZE", "256")),
+    ttl_seconds=int(os.getenv("NLP_CACHE_TTL_SECONDS", "3600")),
+    disk_dir=os.getenv("NLP_CACHE_DIR") or None
+)
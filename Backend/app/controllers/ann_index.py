@@ -0,0 +1,233 @@
+"""
+Approximate nearest-neighbor index (IVF) for the DKB concept embeddings.
+
+The unit-normalized concept vectors are clustered with spherical k-means into
+n_lists inverted lists. A query is compared against the centroids first and
+only the concepts in the nprobe closest lists are scored exactly, so the cost
+per query grows with nprobe * (count / n_lists) instead of count.
+nprobe trades recall for latency; nprobe == n_lists is exact search.
+
+The index is built by create_embedding.py and saved next to the embedding store:
+    dkb_embeddings.ivf.npz    centroids, list offsets, concept ids + header
+
+The header records the SHA-256 of the embedding matrix it was built from, so an
+index left over from a different DKB (even one with the same concept count) is
+detected and ignored.
+
+Rebuild or validate it against the current store with:
+    python -m app.controllers.ann_index --build --recall
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.controllers import embedding_store
+from app.controllers.dkb_index import normalize_rows
+
+INDEX_FILE = "dkb_embeddings.ivf.npz"
+INDEX_FORMAT_VERSION = 1
+# DKB_ANN=off forces exact search everywhere (validation / debugging)
+ANN_ENABLED = os.getenv("DKB_ANN", "auto").lower() != "off"
+DEFAULT_NPROBE = int(os.getenv("DKB_ANN_NPROBE", "8"))
+# Exact search is faster than IVF on small matrices; the ANN path kicks in above this size
+ANN_MIN_CONCEPTS = int(os.getenv("DKB_ANN_MIN_CONCEPTS", "5000"))
+
+_ASSIGN_CHUNK_ROWS = 16384
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by dot product) for every row, in chunks to bound memory."""
+    labels = np.empty(len(matrix), dtype=np.int32)
+    for start in range(0, len(matrix), _ASSIGN_CHUNK_ROWS):
+        block = np.asarray(matrix[start:start + _ASSIGN_CHUNK_ROWS], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def _spherical_kmeans(matrix: np.ndarray, n_lists: int, iterations: int, seed: int, max_train: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    train = matrix
+    if len(matrix) > max_train:
+        train = matrix[np.sort(rng.choice(len(matrix), max_train, replace=False))]
+    train = np.asarray(train, dtype=np.float32)
+
+    centroids = train[rng.choice(len(train), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(train, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, train)
+        counts = np.bincount(labels, minlength=n_lists)
+
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            # Re-seed empty lists with random training points
+            sums[empty] = train[rng.choice(len(train), len(empty), replace=False)]
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = sums / norms
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_ids: np.ndarray, meta: dict):
+        """
+        Args:
+            centroids: (n_lists, dim) unit-length list centroids
+            list_offsets: (n_lists + 1,) start of each list in list_ids
+            list_ids: concept row ids grouped by list
+            meta: Header (count, dim, model, matrix_sha256) used to check the index matches the store
+        """
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.meta = meta
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, model_name: Optional[str] = None, n_lists: Optional[int] = None,
+              iterations: int = 20, seed: int = 0, max_train: int = 100000,
+              source_digest: Optional[str] = None) -> "IVFIndex":
+        """
+        Cluster unit-normalized rows of matrix into n_lists lists (default ~ 4 * sqrt(count)).
+        source_digest is the EmbeddingStore.digest the matrix came from (defaults to a digest of matrix itself).
+        """
+        count = len(matrix)
+        if count == 0:
+            raise ValueError("Cannot build an ANN index over an empty matrix")
+        n_lists = min(n_lists or max(1, int(4 * np.sqrt(count))), count)
+
+        centroids = _spherical_kmeans(matrix, n_lists, iterations, seed, max_train)
+        labels = _assign(matrix, centroids)
+        list_ids = np.argsort(labels, kind="stable").astype(np.int32)
+        list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        list_offsets[1:] = np.cumsum(np.bincount(labels, minlength=n_lists))
+
+        meta = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "model": model_name,
+            "count": int(count),
+            "dim": int(matrix.shape[1]),
+            "n_lists": int(n_lists),
+            "matrix_sha256": source_digest or embedding_store.matrix_digest(matrix)
+        }
+        return cls(centroids.astype(np.float32), list_offsets, list_ids, meta)
+
+    def save(self, store_dir: str = embedding_store.STORE_DIR) -> str:
+        path = os.path.join(store_dir, INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, centroids=self.centroids, list_offsets=self.list_offsets,
+                     list_ids=self.list_ids, meta=np.array(json.dumps(self.meta)))
+        os.replace(tmp_path, path)
+        print(f"Saved IVF index ({self.n_lists} lists over {self.meta['count']} concepts) to {path}")
+        return path
+
+    @classmethod
+    def load(cls, store_dir: str = embedding_store.STORE_DIR) -> Optional["IVFIndex"]:
+        """Return the saved index, or None if there is none."""
+        path = os.path.join(store_dir, INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(data["centroids"], data["list_offsets"], data["list_ids"], meta)
+
+    def matches(self, store: "embedding_store.EmbeddingStore") -> bool:
+        if self.meta.get("count") != len(store) or self.meta.get("dim") != store.dim:
+            return False
+        return self.meta.get("matrix_sha256") == store.digest
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k: int, nprobe: int = DEFAULT_NPROBE) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k by dot product for unit-normalized queries against the
+        unit-normalized matrix the index was built from.
+        Returns (indices, scores), each of shape (queries, k), best match first.
+        """
+        nprobe = max(1, min(nprobe, self.n_lists))
+        k = min(k, len(matrix))
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        scores = np.empty((len(queries), k), dtype=np.float32)
+
+        centroid_scores = queries @ self.centroids.T
+        if nprobe < self.n_lists:
+            probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.n_lists), (len(queries), self.n_lists))
+
+        for row, query in enumerate(queries):
+            candidates = np.concatenate([
+                self.list_ids[self.list_offsets[i]:self.list_offsets[i + 1]] for i in probes[row]
+            ])
+            if len(candidates) < k:
+                # Probed lists too small to fill k: score everything for this query
+                candidates = np.arange(len(matrix))
+            # Sorted ids keep reads from a memory-mapped matrix sequential
+            candidates = np.sort(candidates)
+            candidate_scores = np.asarray(matrix[candidates] @ query, dtype=np.float32)
+
+            top = np.argpartition(-candidate_scores, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+            top = top[np.argsort(-candidate_scores[top], kind="stable")]
+            indices[row] = candidates[top]
+            scores[row] = candidate_scores[top]
+        return indices, scores
+
+
+def recall_at_k(index: IVFIndex, matrix: np.ndarray, queries: np.ndarray, k: int, nprobe: int) -> float:
+    """Fraction of the exact top-k neighbors that the IVF search also returns."""
+    exact = np.argsort(-(queries @ np.asarray(matrix).T), axis=1)[:, :k]
+    approx, _ = index.search(matrix, queries, k, nprobe)
+    found = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+    return found / exact.size if exact.size else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or validate the DKB IVF index")
+    parser.add_argument("--build", action="store_true", help="(Re)build the index from the current store")
+    parser.add_argument("--n-lists", type=int, help="Number of inverted lists (default ~ 4 * sqrt(count))")
+    parser.add_argument("--recall", action="store_true", help="Measure recall@k against exact search")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=200, help="Concept rows reused as recall queries")
+    parser.add_argument("--store-dir", default=embedding_store.STORE_DIR)
+    args = parser.parse_args()
+
+    store = embedding_store.load_store(args.store_dir)
+    matrix = store.matrix if store.normalized else normalize_rows(store.matrix)
+
+    if args.build:
+        start = time.perf_counter()
+        index = IVFIndex.build(matrix, store.model_name, args.n_lists, source_digest=store.digest)
+        print(f"Built in {time.perf_counter() - start:.1f}s")
+        index.save(args.store_dir)
+    else:
+        index = IVFIndex.load(args.store_dir)
+        if index is None:
+            print(f"No {INDEX_FILE} in {args.store_dir}. Run with --build.")
+            return
+    if not index.matches(store):
+        print("Warning: index does not match the embedding store (different matrix). Rebuild it.")
+        return
+
+    if args.recall:
+        rng = np.random.default_rng(1)
+        sample = rng.choice(len(matrix), min(args.queries, len(matrix)), replace=False)
+        queries = np.asarray(matrix[np.sort(sample)], dtype=np.float32)
+        for nprobe in sorted({1, 2, 4, 8, 16, 32, index.n_lists}):
+            if nprobe > index.n_lists:
+                continue
+            start = time.perf_counter()
+            recall = recall_at_k(index, matrix, queries, args.k, nprobe)
+            elapsed = (time.perf_counter() - start) * 1000 / len(queries)
+            print(f"nprobe={nprobe:<5} recall@{args.k}={recall:.3f}  ~{elapsed:.2f} ms/query (incl. exact reference)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,26 @@ Context Manager for maintaining conversation history and user session context.
 Handles multi-turn conversations and provides context-aware recommendations.
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Set
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
+import hashlib
 import json
+import re
 from collections import defaultdict
 import uuid
 
+from app.controllers.analysis_cache import normalize_text
+
+
+# Requirement lists merged across turns, and the key used to detect duplicates
+MERGED_REQUIREMENT_LISTS = ["functional_requirements", "non_functional_requirements", "constraints", "business_rules"]
+
+
+def sentence_fingerprint(sentence: str) -> str:
+    """Stable fingerprint of a sentence, insensitive to case and whitespace."""
+    return hashlib.sha256(normalize_text(sentence).lower().encode("utf-8")).hexdigest()[:16]
+
 
 class Message(BaseModel):
     """Represents a single message in the conversation"""
@@ -30,6 +43,7 @@ class ConversationContext(BaseModel):
     
     # Domain-specific context
     current_requirements: Optional[Dict[str, Any]] = None
+    analyzed_sentence_fingerprints: Set[str] = Field(default_factory=set)
     nlp_analysis_history: List[Dict[str, Any]] = []
     architecture_recommendations: List[Dict[str, Any]] = []
     
@@ -107,37 +121,125 @@ class ContextManager:
         session_id: str, 
         requirements: Dict[str, Any]
     ) -> bool:
-        """Update the current requirements in the session context"""
+        """
+        Merge newly extracted requirements into the session context.
+        Items whose text is already present are skipped; appended items are renumbered
+        so IDs stay unique (e.g. a new FR1 becomes FR4 after three existing FRs).
+        """
         session = self.get_session(session_id)
         
         if not session:
             return False
         
-        # Merge with existing requirements if any
         if session.current_requirements:
-            # Append new functional requirements
-            if "functional_requirements" in requirements:
-                existing_frs = session.current_requirements.get("functional_requirements", [])
-                existing_frs.extend(requirements["functional_requirements"])
-                requirements["functional_requirements"] = existing_frs
+            merged = dict(session.current_requirements)
+            
+            for key in MERGED_REQUIREMENT_LISTS:
+                if key in requirements:
+                    merged[key] = self._merge_requirement_list(merged.get(key, []), requirements[key])
+            
+            for key in ("actors", "technologies_mentioned"):
+                if key in requirements:
+                    merged[key] = list(dict.fromkeys((merged.get(key) or []) + (requirements[key] or [])))
             
-            # Merge non-functional requirements
-            if "non_functional_requirements" in requirements:
-                existing_nfrs = session.current_requirements.get("non_functional_requirements", [])
-                existing_nfrs.extend(requirements["non_functional_requirements"])
-                requirements["non_functional_requirements"] = existing_nfrs
+            if "entities" in requirements:
+                entities = {e["name"]: e for e in merged.get("entities") or []}
+                for entity in requirements["entities"] or []:
+                    if entity["name"] in entities:
+                        attributes = entities[entity["name"]].get("attributes") or []
+                        entities[entity["name"]] = {
+                            **entities[entity["name"]],
+                            "attributes": list(dict.fromkeys(attributes + (entity.get("attributes") or [])))
+                        }
+                    else:
+                        entities[entity["name"]] = entity
+                merged["entities"] = list(entities.values())
             
-            # Merge constraints
-            if "constraints" in requirements:
-                existing_constraints = session.current_requirements.get("constraints", [])
-                existing_constraints.extend(requirements["constraints"])
-                requirements["constraints"] = existing_constraints
+            if "relationships" in requirements:
+                relationships = merged.get("relationships") or []
+                seen = {(r["source"], r["target"], r["type"]) for r in relationships}
+                merged["relationships"] = relationships + [
+                    r for r in requirements["relationships"] or []
+                    if (r["source"], r["target"], r["type"]) not in seen
+                ]
+            
+            # Remaining fields (confidence, raw_input, domain, ...) come from the latest analysis;
+            # the summary of the conversation's first analysis is kept
+            for key, value in requirements.items():
+                if key in MERGED_REQUIREMENT_LISTS or key in ("actors", "technologies_mentioned", "entities", "relationships"):
+                    continue
+                if key == "summary" and merged.get("summary"):
+                    continue
+                merged[key] = value
+            
+            requirements = merged
         
         session.current_requirements = requirements
         session.last_updated = datetime.now()
         
         return True
     
+    @staticmethod
+    def _merge_requirement_list(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        merged = list(existing or [])
+        seen_texts = {normalize_text(item.get("text", "")).lower() for item in merged}
+        
+        for item in new or []:
+            text_key = normalize_text(item.get("text", "")).lower()
+            if text_key in seen_texts:
+                continue
+            seen_texts.add(text_key)
+            
+            prefix = re.match(r"[A-Za-z]*", str(item.get("id", ""))).group(0)
+            if prefix:
+                numbers = [
+                    int(match.group(1)) for other in merged
+                    if (match := re.fullmatch(rf"{prefix}(\d+)", str(other.get("id", ""))))
+                ]
+                item = {**item, "id": f"{prefix}{max(numbers, default=0) + 1}"}
+            merged.append(item)
+        
+        return merged
+    
+    def get_new_sentences(self, session_id: str, sentences: List[str]) -> List[str]:
+        """Return the sentences (in order, without repeats) the session has not analyzed yet"""
+        session = self.get_session(session_id)
+        
+        if not session:
+            return list(sentences)
+        
+        new_sentences = []
+        seen = set(session.analyzed_sentence_fingerprints)
+        for sentence in sentences:
+            fingerprint = sentence_fingerprint(sentence)
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                new_sentences.append(sentence)
+        
+        return new_sentences
+    
+    def mark_sentences_analyzed(self, session_id: str, sentences: List[str]) -> bool:
+        """Record sentence fingerprints once their analysis has been merged into the session"""
+        session = self.get_session(session_id)
+        
+        if not session:
+            return False
+        
+        session.analyzed_sentence_fingerprints.update(sentence_fingerprint(s) for s in sentences)
+        return True
+    
+    def reset_requirements(self, session_id: str) -> bool:
+        """Forget accumulated requirements so the next analysis starts from scratch"""
+        session = self.get_session(session_id)
+        
+        if not session:
+            return False
+        
+        session.current_requirements = None
+        session.analyzed_sentence_fingerprints = set()
+        session.last_updated = datetime.now()
+        return True
+    
     def add_nlp_analysis(
         self, 
         session_id: str, 
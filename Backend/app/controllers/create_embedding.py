@@ -1,8 +1,11 @@
-import json
+# Run from the Backend directory: python -m app.controllers.create_embedding
 import os
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
+
+from app.controllers.embedding_store import save_store
+from app.controllers.embedding_backend import EMBEDDING_MODEL_NAME, load_encoder
+from app.controllers.ann_index import IVFIndex
 
 # --- Load Environment and Connect to Neo4j ---
 load_dotenv()
@@ -11,8 +14,9 @@ USER = os.getenv("NEO4J_USER")
 PASS = os.getenv("NEO4J_PASSWORD")
 driver = GraphDatabase.driver(URI, auth=(USER, PASS))
 
-# Load the embedding model (a popular, fast, and high-quality model)
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Load the embedding model (a popular, fast, and high-quality model).
+# Same backend as RAG (EMBEDDING_BACKEND) so DKB and query vectors live in the same space.
+model = load_encoder()
 
 def fetch_all_concepts(session):
     """
@@ -44,7 +48,7 @@ def fetch_all_concepts(session):
 def create_and_save_embeddings(concepts):
     """
     Takes the list of concepts and generates embeddings.
-    Saves them to a JSON file.
+    Saves them as a float32 .npy matrix, a concept table and a JSON header (see embedding_store).
     """
     print(f"Found {len(concepts)} concepts. Generating embeddings...")
     
@@ -55,20 +59,14 @@ def create_and_save_embeddings(concepts):
     ]
     
     # Generate embeddings. This is the main AI step.
-    embeddings = model.encode(texts_to_embed, show_progress_bar=True)
-    
-    # Store concepts and embeddings in a file-friendly format
-    output_data = {
-        # We store the concepts so we know what each embedding row refers to
-        "concepts": concepts,
-        # We convert the numpy array to a standard list to save as JSON
-        "embeddings": embeddings.tolist() 
-    }
+    # Unit-length rows let the search side use a plain dot product as cosine similarity.
+    embeddings = model.encode(texts_to_embed, normalize=True, show_progress_bar=True)
     
-    with open('dkb_embeddings.json', 'w') as f:
-        json.dump(output_data, f)
-        
-    print("Successfully saved concepts and embeddings to 'dkb_embeddings.json'")
+    # The concepts are stored next to the matrix so we know what each embedding row refers to
+    store = save_store(concepts, embeddings, EMBEDDING_MODEL_NAME)
+
+    # Approximate search index, saved next to the embeddings (used by RAG for large DKBs)
+    IVFIndex.build(store.matrix, EMBEDDING_MODEL_NAME, source_digest=store.digest).save()
 
 def main():
     if driver is None:
@@ -0,0 +1,126 @@
+"""
+Vectorized similarity search over the DKB concept embeddings (Stage 1 mapper).
+
+DKB vectors are L2-normalized once when the index is built, so scoring a batch
+of snippets is a single matrix multiply, and the top-k candidates per snippet
+are selected with argpartition instead of sorting the whole concept set.
+Concept labels are resolved to output buckets once, up front, and concept
+names are compiled into a keyword automaton so exact mentions are found in a
+single pass over the snippets.
+
+Large concept sets can attach an approximate IVF index (see ann_index); top_k
+then probes only the closest lists unless exact=True is requested.
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.controllers.keyword_matcher import KeywordMatcher
+
+# DKB concept labels (lowercased) -> Stage 1 output bucket
+LABEL_MAPPING = {
+    "nfr": "nfrs",
+    "quality_attribute": "nfrs",
+    "quality": "nfrs",
+    "constraint": "constraints",
+    "technical_constraint": "constraints",
+    "domain": "domains",
+    "industry": "domains",
+    "system_type": "domains"
+}
+BUCKETS = ("nfrs", "constraints", "domains")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ConceptIndex:
+    def __init__(self, concepts: List[Dict], matrix: np.ndarray, normalized: bool = False,
+                 ann=None, nprobe: int = 8, ann_min_concepts: int = 5000):
+        """
+        Args:
+            concepts: Concept dicts (name, label, ...) in matrix row order
+            matrix: (count, dim) embedding matrix; may be a read-only memmap
+            normalized: True if rows are already unit length (they are then used as-is, without a copy)
+            ann: Optional ann_index.IVFIndex built over this matrix
+            nprobe: Lists probed per query by the ANN index (higher = better recall, slower)
+            ann_min_concepts: Below this many concepts exact search is used even with an ANN index
+        """
+        self.concepts = concepts
+        self.ann = ann
+        self.nprobe = nprobe
+        self.ann_min_concepts = ann_min_concepts
+        self.matrix = matrix if normalized else normalize_rows(matrix)
+        self.names = [concept["name"] for concept in concepts]
+        self.labels = [concept.get("label", "").lower() for concept in concepts]
+        self.buckets: List[Optional[str]] = [LABEL_MAPPING.get(label) for label in self.labels]
+
+        # Rows whose label maps to one of the Stage 1 buckets
+        self.mappable = np.array([bucket is not None for bucket in self.buckets], dtype=bool)
+
+        # Lowercased concept name -> bucket, for exact keyword mentions
+        self._keyword_matcher = KeywordMatcher()
+        self._names_by_keyword: Dict[Tuple[str, str], List[str]] = {}
+        for name, bucket in zip(self.names, self.buckets):
+            if bucket and name:
+                keyword = name.lower()
+                self._keyword_matcher.add_keyword(bucket, keyword)
+                self._names_by_keyword.setdefault((bucket, keyword), []).append(name)
+        self._keyword_matcher.build()
+
+    @classmethod
+    def from_store(cls, store, **kwargs) -> "ConceptIndex":
+        return cls(store.concepts, store.matrix, normalized=store.normalized, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.concepts)
+
+    def score(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every query against every concept, shape (queries, concepts)."""
+        return normalize_rows(query_embeddings) @ self.matrix.T
+
+    @property
+    def uses_ann(self) -> bool:
+        return self.ann is not None and len(self) >= self.ann_min_concepts
+
+    def top_k(self, query_embeddings: np.ndarray, k: int = 3, exact: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (indices, scores), each of shape (queries, k), best match first.
+        Uses the ANN index when one is attached and large enough, unless exact is set.
+        """
+        if self.uses_ann and not exact:
+            return self.ann.search(self.matrix, normalize_rows(query_embeddings), k, self.nprobe)
+
+        scores = self.score(query_embeddings)
+        k = min(k, scores.shape[1])
+        if k == 0:
+            empty = np.empty((scores.shape[0], 0))
+            return empty.astype(np.int64), empty
+
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+
+        # Only the k candidates get sorted
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+    def keyword_matches(self, texts: Iterable[str]) -> Dict[str, Set[str]]:
+        """
+        Concepts whose lowercased name occurs in any of the texts, as {bucket: {concept names}}.
+        Same result as checking `name.lower() in text.lower()` per concept and text.
+        """
+        # Names never contain a newline, so no match can span two snippets
+        combined = "\n".join(text.lower() for text in texts)
+        matches: Dict[str, Set[str]] = {}
+        for bucket, keywords in self._keyword_matcher.find(combined).items():
+            for keyword in keywords:
+                matches.setdefault(bucket, set()).update(self._names_by_keyword[(bucket, keyword)])
+        return matches
@@ -0,0 +1,94 @@
+"""
+Memo of RAG Stage 2 results by mapped-concept signature.
+
+The Stage 2 output (ranked patterns + tech stack of the top choice) depends only
+on the sets of nfrs / constraints / domains produced by Stage 1 and on the DKB
+itself. Results are keyed by the sorted concept signature and stored per DKB
+version: when seed_dkb.py stamps a new (:DKBMeta) version, the first lookup
+that sees it drops every entry of the old one.
+
+With the DKB snapshot enabled the version is the snapshot's. On the Cypher
+path (DKB_SNAPSHOT=false) the version is read from Neo4j at most every
+DKB_REFRESH_SECONDS, so a repeat profile needs no query at all.
+"""
+
+import copy
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from cachetools import LRUCache
+
+from app.controllers.dkb_index import BUCKETS
+from app.controllers.dkb_snapshot import DKB_REFRESH_SECONDS, read_dkb_version_async
+
+DKB_RESULT_CACHE_ENABLED = os.getenv("DKB_RESULT_CACHE", "true").lower() == "true"
+DKB_RESULT_CACHE_SIZE = int(os.getenv("DKB_RESULT_CACHE_SIZE", "4096"))
+
+def concept_signature(mapped_inputs: dict) -> Tuple[Tuple[str, ...], ...]:
+    """Canonical form of a Stage 1 mapping: one sorted, de-duplicated tuple per bucket."""
+    return tuple(tuple(sorted(set(mapped_inputs.get(bucket) or []))) for bucket in BUCKETS)
+
+
+class DKBResultCache:
+    def __init__(self, maxsize: int = DKB_RESULT_CACHE_SIZE, refresh_seconds: float = DKB_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._results = LRUCache(maxsize=max(maxsize, 1))
+        self._version: Optional[str] = None
+        self._checked_version: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, version: str, mapped_inputs: dict) -> Optional[dict]:
+        """A copy of the cached result for this signature, or None."""
+        signature = concept_signature(mapped_inputs)
+        with self._lock:
+            self._switch_version(version)
+            result = self._results.get(signature)
+            self._stats["hits" if result is not None else "misses"] += 1
+        return copy.deepcopy(result) if result is not None else None
+
+    def put(self, version: str, mapped_inputs: dict, result: dict):
+        signature = concept_signature(mapped_inputs)
+        with self._lock:
+            if self._version is None:
+                self._switch_version(version)
+            elif version != self._version:
+                # Computed against a DKB version another request has already moved past
+                return
+            self._results[signature] = copy.deepcopy(result)
+
+    def _switch_version(self, version: str):
+        # Caller holds the lock
+        if version != self._version:
+            if self._version is not None:
+                self._stats["invalidations"] += 1
+                print(f"DKB version changed ({self._version} -> {version}); dropped {len(self._results)} cached Stage 2 results.")
+            self._results.clear()
+            self._version = version
+
+    def _version_is_fresh(self) -> bool:
+        return self._checked_version is not None and time.monotonic() - self._checked_at < self.refresh_seconds
+
+    async def version_async(self, pool) -> str:
+        """DKB version for the Cypher path, read from Neo4j (pool: neo4j_pool.AsyncNeo4jPool) at most every refresh_seconds."""
+        if not self._version_is_fresh():
+            async with pool.session() as session:
+                self._checked_version = await read_dkb_version_async(session)
+            self._checked_at = time.monotonic()
+        return self._checked_version
+
+    def invalidate(self):
+        with self._lock:
+            self._results.clear()
+            self._version = None
+            self._checked_version = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._results), "version": self._version}
+
+
+dkb_result_cache = DKBResultCache()
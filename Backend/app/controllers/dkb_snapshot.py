@@ -0,0 +1,290 @@
+"""
+In-memory snapshot of the DKB used to rank patterns (RAG Stage 2).
+
+The pattern -> concept relationships that drive the ranking (PROMOTES, HINDERS,
+SUITS, MEETS_CONSTRAINT) are loaded once into a weighted pattern x concept
+matrix. Scoring a request is then a single matrix-vector product:
+
+    fitScore = 2 * promotes + domains + 3 * constraints - 5 * hinders
+
+ordered by fitScore DESC, cost ASC (missing cost last), exactly like the Cypher
+ranking query kept below as CYPHER_RANKING_QUERY. Neo4j stays the source of
+truth: seed_dkb.py stamps a (:DKBMeta) version node and the snapshot reloads
+when that version changes, checking at most every DKB_REFRESH_SECONDS.
+
+The snapshot also materializes the tech stack of every pattern (component type ->
+alternative components with license, cost model and tags), so Stage 2 needs no
+database round trip at all for a recommendation.
+
+Compare the snapshot with the Cypher ranking on random concept sets:
+    python -m app.controllers.dkb_snapshot --verify 200
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DKB_REFRESH_SECONDS = float(os.getenv("DKB_REFRESH_SECONDS", "30"))
+DKB_META_LABEL = "DKBMeta"
+
+# Relationship -> (target label, Stage 1 bucket, weight in fitScore)
+SCORED_RELATIONSHIPS = {
+    "PROMOTES": ("NFR", "nfrs", 2),
+    "HINDERS": ("NFR", "nfrs", -5),
+    "SUITS": ("Domain", "domains", 1),
+    "MEETS_CONSTRAINT": ("Constraint", "constraints", 3)
+}
+
+CYPHER_RANKING_QUERY = """
+WITH $nfrs AS nfrs, $constraints AS constraints, $domains AS domains
+MATCH (p:Pattern)
+WITH p, p.cost AS baseCost, nfrs, constraints, domains
+OPTIONAL MATCH (p)-[:PROMOTES]->(n:NFR) WHERE n.name IN nfrs
+WITH p, baseCost, nfrs, constraints, domains, count(n) * 2 AS promoteScore
+OPTIONAL MATCH (p)-[:HINDERS]->(n:NFR) WHERE n.name IN nfrs
+WITH p, baseCost, nfrs, constraints, domains, promoteScore, count(n) * 5 AS hinderScore
+OPTIONAL MATCH (p)-[:SUITS]->(d:Domain) WHERE d.name IN domains
+WITH p, baseCost, nfrs, constraints, domains, promoteScore, hinderScore, count(d) AS domainScore
+OPTIONAL MATCH (p)-[:MEETS_CONSTRAINT]->(c:Constraint) WHERE c.name IN constraints
+WITH p, baseCost, promoteScore, hinderScore, domainScore, count(c) * 3 AS constraintScore
+WITH p, baseCost, (promoteScore + domainScore + constraintScore - hinderScore) AS fitScore
+RETURN p.name AS pattern, p.description AS description, fitScore, baseCost
+ORDER BY fitScore DESC, baseCost ASC
+"""
+
+_PATTERNS_QUERY = """
+MATCH (p:Pattern)
+RETURN elementId(p) AS key, p.name AS name, p.description AS description, p.cost AS cost
+"""
+
+_EDGES_QUERY = """
+MATCH (p:Pattern)-[r:PROMOTES|HINDERS|SUITS|MEETS_CONSTRAINT]->(c)
+RETURN elementId(p) AS pattern_key, type(r) AS rel, elementId(c) AS concept_key,
+       c.name AS concept, labels(c) AS labels
+"""
+
+
+# Same shape as the per-pattern RAG.TECH_STACK_QUERY, for all patterns at once
+_TECH_STACKS_QUERY = """
+MATCH (p:Pattern)-[:REQUIRES]->(ct:ComponentType)
+OPTIONAL MATCH (ct)<-[:IS_A]-(c:Component)
+RETURN p.name AS pattern,
+       ct.name AS component_type,
+       collect({
+         name: c.name,
+         license: c.license,
+         cost_model: c.cost_model,
+         tags: c.tags
+       }) AS alternatives
+"""
+
+
+_VERSION_QUERY = f"MATCH (m:{DKB_META_LABEL}) RETURN m.version AS version LIMIT 1"
+_NODE_COUNT_QUERY = "MATCH (n) RETURN count(n) AS total"
+_REL_COUNT_QUERY = "MATCH ()-[r]->() RETURN count(r) AS total"
+
+
+def read_dkb_version(session) -> str:
+    """Version stamped by seed_dkb.py, or node/relationship counts for an unstamped graph."""
+    rows = session.run(_VERSION_QUERY).data()
+    if rows and rows[0]["version"]:
+        return str(rows[0]["version"])
+    nodes = session.run(_NODE_COUNT_QUERY).data()[0]["total"]
+    rels = session.run(_REL_COUNT_QUERY).data()[0]["total"]
+    return f"unversioned:{nodes}:{rels}"
+
+
+async def read_dkb_version_async(session) -> str:
+    """read_dkb_version for a neo4j AsyncSession."""
+    rows = await (await session.run(_VERSION_QUERY)).data()
+    if rows and rows[0]["version"]:
+        return str(rows[0]["version"])
+    nodes = (await (await session.run(_NODE_COUNT_QUERY)).data())[0]["total"]
+    rels = (await (await session.run(_REL_COUNT_QUERY)).data())[0]["total"]
+    return f"unversioned:{nodes}:{rels}"
+
+
+class DKBSnapshot:
+    def __init__(self, version: str, patterns: List[Dict], weights: np.ndarray, columns: Dict[str, Dict[str, List[int]]],
+                 tech_stacks: Optional[Dict[str, Dict[str, List[Dict]]]] = None):
+        """
+        Args:
+            version: DKB version the snapshot was loaded from
+            patterns: [{name, description, cost}] in graph order (one row of weights each)
+            weights: (patterns, columns) matrix; each column is one (relationship, concept node)
+                     pair and holds weight * edge count
+            columns: {bucket: {concept name: [column indices]}}
+            tech_stacks: {pattern name: {component type: [alternative components]}}
+        """
+        self.version = version
+        self.patterns = patterns
+        self.weights = weights
+        self.columns = columns
+        self.tech_stacks = tech_stacks or {}
+        self.loaded_at = time.time()
+
+        costs = [pattern["cost"] for pattern in patterns]
+        # Sort keys for "baseCost ASC" with missing costs last (Cypher orders nulls last)
+        self._cost_missing = np.array([cost is None for cost in costs])
+        self._cost_values = np.array([0 if cost is None else cost for cost in costs], dtype=np.float64)
+        self._graph_order = np.arange(len(patterns))
+
+    @classmethod
+    def load(cls, session, version: Optional[str] = None) -> "DKBSnapshot":
+        version = version or read_dkb_version(session)
+        return cls.from_rows(
+            version,
+            session.run(_PATTERNS_QUERY).data(),
+            session.run(_EDGES_QUERY).data(),
+            session.run(_TECH_STACKS_QUERY).data()
+        )
+
+    @classmethod
+    async def load_async(cls, session, version: Optional[str] = None) -> "DKBSnapshot":
+        version = version or await read_dkb_version_async(session)
+        return cls.from_rows(
+            version,
+            await (await session.run(_PATTERNS_QUERY)).data(),
+            await (await session.run(_EDGES_QUERY)).data(),
+            await (await session.run(_TECH_STACKS_QUERY)).data()
+        )
+
+    @classmethod
+    def from_rows(cls, version: str, pattern_rows: List[Dict], edge_rows: List[Dict], stack_rows: List[Dict]) -> "DKBSnapshot":
+        patterns = []
+        rows = {}
+        for record in pattern_rows:
+            rows[record["key"]] = len(patterns)
+            patterns.append({"name": record["name"], "description": record["description"], "cost": record["cost"]})
+
+        column_index: Dict[tuple, int] = {}
+        columns: Dict[str, Dict[str, List[int]]] = {bucket: {} for _, bucket, _ in SCORED_RELATIONSHIPS.values()}
+        entries = []
+        for record in edge_rows:
+            target_label, bucket, weight = SCORED_RELATIONSHIPS[record["rel"]]
+            if target_label not in record["labels"] or record["pattern_key"] not in rows:
+                continue
+            key = (record["rel"], record["concept_key"])
+            if key not in column_index:
+                column_index[key] = len(column_index)
+                columns[bucket].setdefault(record["concept"], []).append(column_index[key])
+            entries.append((rows[record["pattern_key"]], column_index[key], weight))
+
+        weights = np.zeros((len(patterns), len(column_index)), dtype=np.float64)
+        if entries:
+            pattern_rows, column_ids, values = zip(*entries)
+            np.add.at(weights, (list(pattern_rows), list(column_ids)), values)
+
+        tech_stacks: Dict[str, Dict[str, List[Dict]]] = {}
+        for record in stack_rows:
+            stack = tech_stacks.setdefault(record["pattern"], {})
+            stack.setdefault(record["component_type"], []).extend(record["alternatives"])
+
+        print(f"Loaded DKB snapshot {version}: {len(patterns)} patterns, {len(entries)} scored relationships, "
+              f"{len(tech_stacks)} tech stacks")
+        return cls(version, patterns, weights, columns, tech_stacks)
+
+    def fit_scores(self, mapped_inputs: Dict[str, List[str]]) -> np.ndarray:
+        selected = np.zeros(self.weights.shape[1], dtype=np.float64)
+        for bucket, names in self.columns.items():
+            for name in set(mapped_inputs.get(bucket, [])):
+                selected[names.get(name, [])] = 1.0
+        return self.weights @ selected
+
+    def tech_stack(self, pattern_name: str) -> Dict[str, List[Dict]]:
+        """Component type -> alternatives for a pattern. Returns a copy, so callers may modify it freely."""
+        return copy.deepcopy(self.tech_stacks.get(pattern_name, {}))
+
+    def rank(self, mapped_inputs: Dict[str, List[str]]) -> List[Dict]:
+        """Same records and order as CYPHER_RANKING_QUERY."""
+        scores = self.fit_scores(mapped_inputs)
+        # lexsort: last key is primary -> fitScore DESC, cost ASC (nulls last), graph order
+        order = np.lexsort((self._graph_order, self._cost_values, self._cost_missing, -scores))
+        return [
+            {
+                "pattern": self.patterns[i]["name"],
+                "description": self.patterns[i]["description"],
+                "fitScore": int(round(scores[i])),
+                "baseCost": self.patterns[i]["cost"]
+            }
+            for i in order
+        ]
+
+
+class DKBSnapshotManager:
+    """Holds the current snapshot and reloads it when the DKB version in Neo4j changes."""
+
+    def __init__(self, refresh_seconds: float = DKB_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._snapshot: Optional[DKBSnapshot] = None
+        self._checked_at = 0.0
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def _is_fresh(self) -> bool:
+        return self._snapshot is not None and time.monotonic() - self._checked_at < self.refresh_seconds
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._snapshot.version if self._snapshot else None
+
+    async def get_async(self, pool) -> DKBSnapshot:
+        """Current snapshot, reloaded if the DKB version changed; pool is a neo4j_pool.AsyncNeo4jPool."""
+        if self._is_fresh():
+            return self._snapshot
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self._is_fresh():
+                return self._snapshot
+            async with pool.session() as session:
+                version = await read_dkb_version_async(session)
+                if self._snapshot is None or self._snapshot.version != version:
+                    self._snapshot = await DKBSnapshot.load_async(session, version)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        self._checked_at = 0.0
+
+
+dkb_snapshot = DKBSnapshotManager()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the DKB snapshot ranking against the Cypher query")
+    parser.add_argument("--verify", type=int, default=100, metavar="N", help="Random concept sets to compare")
+    args = parser.parse_args()
+
+    from neo4j import GraphDatabase
+    from dotenv import load_dotenv
+    load_dotenv()
+    driver = GraphDatabase.driver(os.getenv("NEO4J_URI"), auth=(os.getenv("NEO4J_USER"), os.getenv("NEO4J_PASSWORD")))
+
+    with driver.session() as session:
+        snapshot = DKBSnapshot.load(session)
+        vocabulary = {bucket: sorted(names) for bucket, names in snapshot.columns.items()}
+        rng = random.Random(0)
+        mismatches = 0
+        for _ in range(args.verify):
+            mapped = {bucket: rng.sample(names, rng.randint(0, len(names))) for bucket, names in vocabulary.items()}
+            expected = [record.data() for record in session.run(CYPHER_RANKING_QUERY, mapped)]
+            actual = snapshot.rank(mapped)
+            # Patterns tied on both fitScore and cost have no defined order in Cypher
+            key = lambda r: (r["fitScore"], r["baseCost"])
+            if [key(r) for r in expected] != [key(r) for r in actual] or \
+                    sorted(repr((key(r), r["pattern"])) for r in expected) != sorted(repr((key(r), r["pattern"])) for r in actual):
+                mismatches += 1
+                print(f"Mismatch for {mapped}")
+        print(f"{args.verify - mismatches}/{args.verify} concept sets ranked identically")
+    driver.close()
+
+
+if __name__ == "__main__":
+    main()
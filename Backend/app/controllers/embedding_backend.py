@@ -0,0 +1,280 @@
+"""
+Sentence embedding backends shared by RAG.py and create_embedding.py.
+
+EMBEDDING_BACKEND selects the encoder:
+    torch      - sentence-transformers on PyTorch fp32 (default)
+    onnx       - the same transformer exported to ONNX, run with onnxruntime
+    onnx-int8  - the ONNX export with dynamically quantized int8 weights
+
+The ONNX backends only need onnxruntime and tokenizers at runtime (no torch).
+Export the model once (this step needs torch + sentence-transformers) and check
+that the new backend stays within tolerance of the torch embeddings:
+    python -m app.controllers.embedding_backend --export --parity
+
+The ONNX backends are off by default and stay off until that check has passed:
+--parity records its result in the export's embedding_config.json, and
+load_encoder falls back to torch for a backend without a recorded pass.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from app.controllers import embedding_store
+from app.controllers.embedding_cache import model_fingerprint
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR") or os.path.join(
+    embedding_store.STORE_DIR, "onnx", EMBEDDING_MODEL_NAME.replace("/", "__")
+)
+ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))  # 0 = onnxruntime default
+# Minimum cosine similarity to the torch embedding for a backend to pass the parity check
+PARITY_MIN_COSINE = float(os.getenv("EMBEDDING_PARITY_MIN_COSINE", "0.99"))
+
+ONNX_CONFIG_FILE = "embedding_config.json"
+ONNX_MODEL_FILES = {"onnx": "model.onnx", "onnx-int8": "model.int8.onnx"}
+
+
+class TorchEncoder:
+    backend = "torch"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    @property
+    def fingerprint(self) -> str:
+        return model_fingerprint(self.model_name, self.dim, self.backend)
+
+    def encode(self, texts: List[str], normalize: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        embeddings = self.model.encode(list(texts), normalize_embeddings=normalize, show_progress_bar=show_progress_bar)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class OnnxEncoder:
+    def __init__(self, model_dir: str = ONNX_DIR, quantized: bool = True):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE), "r", encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.model_name = self.config["model"]
+        self.dim = self.config["dim"]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, ONNX_MODEL_FILES[self.backend]), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    @property
+    def fingerprint(self) -> str:
+        return model_fingerprint(self.model_name, self.dim, self.backend)
+
+    def encode(self, texts: List[str], normalize: bool = False, show_progress_bar: bool = False,
+               batch_size: int = 32) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": attention_mask,
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+            }
+            hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+
+            if self.config["pooling"] == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = attention_mask[..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(batches)
+        # Mirrors the sentence-transformers pipeline: normalize if it ends in a Normalize module
+        if normalize or self.config["normalize"]:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings
+
+
+def recorded_parity(backend: str, model_dir: str = ONNX_DIR) -> Optional[dict]:
+    """Result of the last --parity run for an ONNX backend, or None if it was never checked."""
+    try:
+        with open(os.path.join(model_dir, ONNX_CONFIG_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("parity", {}).get(backend)
+    except (OSError, ValueError):
+        return None
+
+
+def _record_parity(results: List[dict], model_dir: str = ONNX_DIR):
+    path = os.path.join(model_dir, ONNX_CONFIG_FILE)
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("parity", {}).update({result["backend"]: result for result in results})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+
+def load_encoder(backend: str = EMBEDDING_BACKEND, model_name: str = EMBEDDING_MODEL_NAME):
+    """
+    Build the configured encoder. ONNX backends fall back to torch if the export
+    is missing or has no passing parity check recorded.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Available: {', '.join(BACKENDS)}")
+
+    if backend != "torch":
+        model_path = os.path.join(ONNX_DIR, ONNX_MODEL_FILES[backend])
+        parity = recorded_parity(backend, ONNX_DIR)
+        if os.path.exists(model_path) and not (parity and parity.get("passed")):
+            print(f"Warning: {backend} has no passing parity check against torch ({parity or 'never run'}), "
+                  "using the torch backend. Run 'python -m app.controllers.embedding_backend --parity'.")
+        elif os.path.exists(model_path):
+            encoder = OnnxEncoder(ONNX_DIR, quantized=backend == "onnx-int8")
+            if encoder.model_name != model_name:
+                raise RuntimeError(f"ONNX export in {ONNX_DIR} is for '{encoder.model_name}', expected '{model_name}'")
+            return encoder
+        else:
+            print(f"Warning: {model_path} not found, using the torch backend. "
+                  "Run 'python -m app.controllers.embedding_backend --export'.")
+    return TorchEncoder(model_name)
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL_NAME, out_dir: str = ONNX_DIR, quantize: bool = True):
+    """Export the transformer of a sentence-transformers model to ONNX (and an int8 copy)."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+    pooling = next((module for module in st_model if type(module).__name__ == "Pooling"), None)
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)
+
+    sample = tokenizer(["The system must respond within 200 ms."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    export_kwargs = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+    model_path = os.path.join(out_dir, ONNX_MODEL_FILES["onnx"])
+    with torch.no_grad():
+        torch.onnx.export(
+            auto_model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs
+        )
+    print(f"Exported {model_name} to {model_path}")
+
+    config = {
+        "model": model_name,
+        "dim": st_model.get_sentence_embedding_dimension(),
+        "max_seq_length": st_model.max_seq_length,
+        "pooling": "cls" if pooling is not None and pooling.pooling_mode_cls_token else "mean",
+        "normalize": any(type(module).__name__ == "Normalize" for module in st_model),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id
+    }
+    with open(os.path.join(out_dir, ONNX_CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        int8_path = os.path.join(out_dir, ONNX_MODEL_FILES["onnx-int8"])
+        quantize_dynamic(model_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"Quantized model written to {int8_path}")
+
+
+def parity_texts() -> List[str]:
+    """DKB concept texts (the same strings create_embedding.py embeds) plus typical requirement sentences."""
+    texts = [
+        "The system must handle 10,000 concurrent users with response times under 200 ms.",
+        "Patients can book, reschedule and cancel appointments from the mobile app.",
+        "All personal data must be stored in the EU to comply with GDPR.",
+        "The platform should stay available during a single data center outage.",
+        "Budget is limited, so prefer open source components and a small team."
+    ]
+    try:
+        store = embedding_store.load_store()
+        texts += [f"{c['label']}: {c['name']}. {c.get('description', '')}" for c in store.concepts]
+    except FileNotFoundError:
+        pass
+    return texts
+
+
+def check_parity(candidate, reference, texts: Optional[List[str]] = None,
+                 min_cosine: float = PARITY_MIN_COSINE) -> dict:
+    """Compare a candidate encoder with the reference, row by row, by cosine similarity."""
+    texts = texts or parity_texts()
+    a = candidate.encode(texts, normalize=True)
+    b = reference.encode(texts, normalize=True)
+    cosines = np.sum(a * b, axis=1)
+    return {
+        "backend": candidate.backend,
+        "texts": len(texts),
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "passed": bool(cosines.min() >= min_cosine)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export ONNX embedding backends and check parity with torch")
+    parser.add_argument("--export", action="store_true", help="Export the model to ONNX and int8 ONNX")
+    parser.add_argument("--parity", action="store_true", help="Compare the ONNX backends with the torch model")
+    parser.add_argument("--min-cosine", type=float, default=PARITY_MIN_COSINE)
+    args = parser.parse_args()
+
+    if args.export:
+        export_onnx()
+
+    if args.parity:
+        reference = TorchEncoder()
+        texts = parity_texts()
+        results = []
+        for backend in ("onnx", "onnx-int8"):
+            candidate = OnnxEncoder(ONNX_DIR, quantized=backend == "onnx-int8")
+            result = check_parity(candidate, reference, texts, args.min_cosine)
+            for encoder in (reference, candidate):
+                start = time.perf_counter()
+                encoder.encode(texts[:8])
+                result[f"{encoder.backend}_ms_per_8"] = round((time.perf_counter() - start) * 1000, 2)
+            print(result)
+            results.append(result)
+        # load_encoder only enables a backend whose recorded result passed
+        _record_parity(results)
+        if not all(result["passed"] for result in results):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Micro-batching of embedding requests from concurrent callers.
+
+Requests arrive from many threads (the blocking I/O pool runs one RAG pipeline
+per request). Instead of one small forward pass per request, a single worker
+thread collects the pending texts for up to max_wait_ms after the first one
+arrives, or until max_batch_size texts are waiting, encodes them in one call
+and hands every caller its own rows. The added latency is bounded by max_wait_ms
+plus the time of the batch that is already running.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "true").lower() == "true"
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+
+class _PendingRequest:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class EmbeddingBatcher:
+    """
+    Wraps an encoder (see embedding_backend) and exposes the same encode / dim /
+    fingerprint / backend interface, so it can be used wherever the encoder is.
+    """
+
+    def __init__(self, encoder, max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+                 max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS):
+        self.encoder = encoder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue: deque = deque()
+        self._queued_texts = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._stats = {"requests": 0, "texts": 0, "batches": 0, "max_batch": 0}
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    @property
+    def dim(self) -> int:
+        return self.encoder.dim
+
+    @property
+    def fingerprint(self) -> str:
+        return self.encoder.fingerprint
+
+    @property
+    def backend(self) -> str:
+        return self.encoder.backend
+
+    def encode(self, texts: List[str], normalize: bool = False, **kwargs) -> np.ndarray:
+        """Blocking; returns one row per text once the batch containing them has been encoded."""
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+
+        request = _PendingRequest(texts)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Embedding batcher is closed")
+            self._queue.append(request)
+            self._queued_texts += len(texts)
+            self._condition.notify()
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        embeddings = request.result
+        if normalize:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._worker.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._condition:
+            batches = self._stats["batches"]
+            return {
+                **self._stats,
+                "mean_batch": round(self._stats["texts"] / batches, 2) if batches else 0.0,
+                "queued_texts": self._queued_texts,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000
+            }
+
+    def _next_batch(self) -> List[_PendingRequest]:
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return []
+
+            # Give concurrent callers a short window to join this batch
+            deadline = time.monotonic() + self.max_wait
+            while self._queued_texts < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            # Whole requests only; a single oversized request still goes alone
+            batch = [self._queue.popleft()]
+            size = len(batch[0].texts)
+            while self._queue and size + len(self._queue[0].texts) <= self.max_batch_size:
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request.texts)
+            self._queued_texts -= size
+
+            self._stats["requests"] += len(batch)
+            self._stats["texts"] += size
+            self._stats["batches"] += 1
+            self._stats["max_batch"] = max(self._stats["max_batch"], size)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            texts = [text for request in batch for text in request.texts]
+            try:
+                embeddings = np.asarray(self.encoder.encode(texts), dtype=np.float32)
+            except BaseException as e:
+                for request in batch:
+                    request.error = e
+                    request.done.set()
+                continue
+
+            offset = 0
+            for request in batch:
+                request.result = embeddings[offset:offset + len(request.texts)]
+                offset += len(request.texts)
+                request.done.set()
@@ -0,0 +1,152 @@
+"""
+Cache for sentence embeddings of user snippets (RAG Stage 1).
+
+Vectors are keyed by a hash of the normalized snippet text plus a model
+fingerprint, held in an in-memory LRU bounded by total vector bytes and
+optionally mirrored to disk as one .npy file per entry. encode() deduplicates
+the snippets of a request and sends only the ones not seen before to the model,
+in a single batch.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Any
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.controllers.analysis_cache import normalize_text
+
+
+def model_fingerprint(model_name: str, dim: int, backend: str = "torch") -> str:
+    """Identifies the vector space; entries from a different model or backend never match."""
+    return f"{model_name}:{dim}:{backend}"
+
+
+class EmbeddingCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None):
+        """
+        Args:
+            max_bytes: Upper bound on the total size of cached vectors in memory (LRU eviction)
+            disk_dir: Optional directory for the on-disk tier; disabled when None
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._memory = LRUCache(maxsize=max(max_bytes, 1), getsizeof=lambda vector: vector.nbytes)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "deduplicated": 0}
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, fingerprint: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray], fingerprint: str) -> np.ndarray:
+        """
+        Return embeddings for texts (one row per text, in order). Only unique,
+        uncached texts are passed to encode_fn, in one call.
+        """
+        keys = [self.make_key(text, fingerprint) for text in texts]
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                with self._lock:
+                    self._stats["deduplicated"] += 1
+                continue
+            vector = self._get(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                vectors[key] = vector
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            for key, vector in zip(missing.keys(), encoded):
+                vector = np.array(vector)  # own copy, detached from the batch array
+                vector.setflags(write=False)
+                vectors[key] = vector
+                self._set(key, vector)
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round((self._stats["hits"] + self._stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+                "entries": len(self._memory),
+                "bytes": int(self._memory.currsize),
+                "max_bytes": self.max_bytes,
+                "disk_enabled": bool(self.disk_dir)
+            }
+
+    def _get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._stats["hits"] += 1
+                return vector
+
+        vector = self._read_disk(key)
+
+        with self._lock:
+            if vector is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._memory[key] = vector
+        return vector
+
+    def _set(self, key: str, vector: np.ndarray):
+        with self._lock:
+            if vector.nbytes <= self.max_bytes:
+                self._memory[key] = vector
+        self._write_disk(key, vector)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if not self.disk_dir:
+            return None
+        try:
+            vector = np.load(self._disk_path(key))
+        except (OSError, ValueError):
+            return None
+        vector.setflags(write=False)
+        return vector
+
+    def _write_disk(self, key: str, vector: np.ndarray):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, vector)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write embedding cache entry to disk. {e}")
+
+
+# Global embedding cache instance
+embedding_cache = EmbeddingCache(
+    max_bytes=int(os.getenv("EMBEDDING_CACHE_MB", "64")) * 1024 * 1024,
+    disk_dir=os.getenv("EMBEDDING_CACHE_DIR") or None
+)
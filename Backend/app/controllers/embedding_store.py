@@ -0,0 +1,215 @@
+"""
+Binary storage for the DKB concept embeddings.
+
+The embedding matrix is stored as a float32 .npy file and opened with
+mmap_mode="r", so every worker process maps the same read-only pages instead of
+parsing and holding its own copy. The concepts (name, label, description) in
+row order are a numpy structured array with fixed-width text fields, mapped the
+same way; a record is decoded only when it is read. A small JSON sidecar holds
+the header (model name, dimension, row count, whether rows are L2-normalized,
+SHA-256 of the matrix).
+
+Files (next to this module by default):
+    dkb_embeddings.npy           float32 matrix, shape (count, dim)
+    dkb_embeddings.concepts.npy  concept records, shape (count,)
+    dkb_embeddings.meta.json     header
+
+Stores written by format 1 (concepts inside the sidecar) are still readable.
+
+The old dkb_embeddings.json format is still readable, and can be converted with:
+    python -m app.controllers.embedding_store --convert path/to/dkb_embeddings.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections.abc import Sequence
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+STORE_FORMAT_VERSION = 2
+STORE_DIR = os.path.dirname(os.path.abspath(__file__))
+MATRIX_FILE = "dkb_embeddings.npy"
+CONCEPTS_FILE = "dkb_embeddings.concepts.npy"
+META_FILE = "dkb_embeddings.meta.json"
+LEGACY_JSON_FILE = "dkb_embeddings.json"
+
+_DIGEST_CHUNK_ROWS = 16384
+CONCEPT_FIELDS = ("name", "label", "description")
+
+
+def matrix_digest(matrix: np.ndarray) -> str:
+    """SHA-256 of the float32 matrix contents (and shape), read in row chunks so a memmap is not copied whole."""
+    digest = hashlib.sha256(repr(tuple(matrix.shape)).encode("utf-8"))
+    for start in range(0, len(matrix), _DIGEST_CHUNK_ROWS):
+        block = np.ascontiguousarray(matrix[start:start + _DIGEST_CHUNK_ROWS], dtype=np.float32)
+        digest.update(block.tobytes())
+    return digest.hexdigest()
+
+
+class ConceptTable(Sequence):
+    """Read-only concept records backed by a (memory-mapped) structured array; rows are returned as dicts."""
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+
+    @classmethod
+    def from_concepts(cls, concepts: List[Dict]) -> "ConceptTable":
+        rows = [tuple(str(concept.get(field) or "") for field in CONCEPT_FIELDS) for concept in concepts]
+        widths = [max([len(row[i]) for row in rows], default=0) or 1 for i in range(len(CONCEPT_FIELDS))]
+        return cls(np.array(rows, dtype=[(field, f"<U{width}") for field, width in zip(CONCEPT_FIELDS, widths)]))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        record = self.records[index]
+        return {field: str(record[field]) for field in self.records.dtype.names}
+
+
+class EmbeddingStore:
+    def __init__(self, concepts: Union[ConceptTable, List[Dict]], matrix: np.ndarray, meta: Dict):
+        self.concepts = concepts
+        self.matrix = matrix
+        self.meta = meta
+
+    @property
+    def model_name(self) -> Optional[str]:
+        return self.meta.get("model")
+
+    @property
+    def dim(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    @property
+    def normalized(self) -> bool:
+        return bool(self.meta.get("normalized"))
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the matrix; read from the header, computed for stores written before it was recorded."""
+        if not self.meta.get("sha256"):
+            self.meta["sha256"] = matrix_digest(self.matrix)
+        return self.meta["sha256"]
+
+    def __len__(self) -> int:
+        return len(self.concepts)
+
+
+def _is_normalized(matrix: np.ndarray, tolerance: float = 1e-3) -> bool:
+    if len(matrix) == 0:
+        return True
+    norms = np.linalg.norm(matrix, axis=1)
+    return bool(np.all(np.abs(norms - 1.0) < tolerance))
+
+
+def save_store(concepts: List[Dict], embeddings, model_name: str, store_dir: str = STORE_DIR) -> EmbeddingStore:
+    """Write the matrix and sidecar atomically (temp file + rename) so running workers never see a partial file."""
+    matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+    if matrix.ndim != 2 or len(matrix) != len(concepts):
+        raise ValueError(f"Expected a ({len(concepts)}, dim) matrix, got shape {matrix.shape}")
+
+    meta = {
+        "format_version": STORE_FORMAT_VERSION,
+        "model": model_name,
+        "dim": int(matrix.shape[1]),
+        "count": int(matrix.shape[0]),
+        "dtype": "float32",
+        "normalized": _is_normalized(matrix),
+        "sha256": matrix_digest(matrix)
+    }
+    table = ConceptTable.from_concepts(concepts)
+
+    os.makedirs(store_dir, exist_ok=True)
+    matrix_path = os.path.join(store_dir, MATRIX_FILE)
+    concepts_path = os.path.join(store_dir, CONCEPTS_FILE)
+    meta_path = os.path.join(store_dir, META_FILE)
+
+    tmp_matrix = f"{matrix_path}.{os.getpid()}.tmp"
+    with open(tmp_matrix, "wb") as f:
+        np.save(f, matrix)
+    tmp_concepts = f"{concepts_path}.{os.getpid()}.tmp"
+    with open(tmp_concepts, "wb") as f:
+        np.save(f, table.records)
+    tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_meta, "w", encoding="utf-8") as f:
+        json.dump(meta, f, separators=(",", ":"))
+
+    # Data files first: a reader that sees the new sidecar also sees the new matrix and concepts
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_concepts, concepts_path)
+    os.replace(tmp_meta, meta_path)
+    print(f"Saved {meta['count']} embeddings (dim {meta['dim']}) to {matrix_path}")
+    return EmbeddingStore(table, matrix, meta)
+
+
+def load_store(store_dir: str = STORE_DIR, mmap: bool = True) -> EmbeddingStore:
+    """
+    Load the binary store, memory-mapped by default. Falls back to the legacy
+    dkb_embeddings.json if the binary files are missing.
+    Raises FileNotFoundError when neither format exists.
+    """
+    matrix_path = os.path.join(store_dir, MATRIX_FILE)
+    meta_path = os.path.join(store_dir, META_FILE)
+
+    if os.path.exists(matrix_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r" if mmap else None)
+        if "concepts" in meta:
+            # Format 1: concepts inline in the sidecar
+            concepts = meta.pop("concepts")
+        else:
+            concepts = ConceptTable(np.load(os.path.join(store_dir, CONCEPTS_FILE), mmap_mode="r" if mmap else None))
+        if matrix.shape != (meta["count"], meta["dim"]) or len(concepts) != meta["count"]:
+            raise ValueError(
+                f"{MATRIX_FILE} has shape {matrix.shape} and {len(concepts)} concepts, header says "
+                f"({meta['count']}, {meta['dim']}). Regenerate the store with create_embedding.py."
+            )
+        return EmbeddingStore(concepts, matrix, meta)
+
+    legacy_path = os.path.join(store_dir, LEGACY_JSON_FILE)
+    if os.path.exists(legacy_path):
+        print(f"Warning: {MATRIX_FILE} not found, loading legacy {legacy_path}. Convert it with "
+              "'python -m app.controllers.embedding_store --convert'.")
+        return _load_legacy_json(legacy_path)
+
+    raise FileNotFoundError(f"No DKB embedding store found in {store_dir}")
+
+
+def _load_legacy_json(path: str) -> EmbeddingStore:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    matrix = np.asarray(data["embeddings"], dtype=np.float32)
+    meta = {
+        "format_version": 0,
+        "model": None,
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "count": len(data["concepts"]),
+        "dtype": "float32",
+        "normalized": _is_normalized(matrix)
+    }
+    return EmbeddingStore(data["concepts"], matrix, meta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or convert the DKB embedding store")
+    parser.add_argument("--convert", metavar="JSON", help="Convert a legacy dkb_embeddings.json into the binary store")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Model name recorded in the header when converting")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.convert:
+        legacy = _load_legacy_json(args.convert)
+        save_store(legacy.concepts, legacy.matrix, args.model, args.store_dir)
+
+    store = load_store(args.store_dir)
+    print(f"model={store.model_name} count={len(store)} dim={store.dim} normalized={store.normalized}")
+
+
+if __name__ == "__main__":
+    main()
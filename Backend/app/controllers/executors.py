@@ -0,0 +1,223 @@
+"""
+Executor layer for work that must not run on the asyncio event loop.
+
+CPU-bound NLP analysis goes to a CPU executor and blocking I/O (Neo4j, Gemini,
+embedding lookups in the RAG pipeline) goes to a thread pool. The CPU executor
+is selected with CPU_EXECUTOR:
+    process - a process pool whose workers hold the NLP pipelines (default)
+    thread  - a thread pool inside this process
+    inline  - run on the event loop (debugging / single-user setups)
+
+In process mode the parent process never builds a spaCy pipeline. Each worker
+preloads only the CPU_PRELOAD_PROFILES (default: CHAT_NLP_PROFILE, the
+interactive /chat/ask path); any other profile is loaded by a worker the first
+time it is asked for one. A loaded en_core_web_sm pipeline adds very roughly
+100 MB to a worker's memory (an estimate, not measured in this tree), so a
+uvicorn worker costs about CPU_EXECUTOR_WORKERS x loaded profiles x that.
+
+In process mode a batch (analyze_many) is split into one slice per pool worker
+and the slices are analyzed in parallel; each worker pipes its slice through
+spaCy with n_process=1, so a batch uses up to CPU_EXECUTOR_WORKERS cores
+without any worker forking further model copies.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from typing import AsyncIterator, Callable, List, Optional, Union
+
+from app.controllers import registry
+from app.controllers.analysis_cache import analysis_cache
+from app.controllers.NLP_Processor import (
+    DEFAULT_PROFILE,
+    DEFAULT_CHUNK_CHARS,
+    ChunkedAnalysis,
+    analysis_cache_key,
+    chunk_text
+)
+from app.models.requirements_model import (
+    RequirementsAnalysisOutput,
+    RequirementsChunkAnalysis,
+    RequirementsStreamSummary
+)
+
+CPU_EXECUTOR = os.getenv("CPU_EXECUTOR", "process").lower()
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", "2"))
+CPU_EXECUTOR_START_METHOD = os.getenv("CPU_EXECUTOR_START_METHOD", "spawn")
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "16"))
+# Comma-separated profiles loaded at startup; others are loaded on first use
+CPU_PRELOAD_PROFILES = [p.strip() for p in os.getenv("CPU_PRELOAD_PROFILES", registry.CHAT_NLP_PROFILE).split(",") if p.strip()]
+
+_cpu_executor: Optional[Executor] = None
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+# --- Worker-side tasks (top-level so they can be pickled for the process pool) ---
+
+def _init_cpu_worker(profiles: List[str]):
+    # Workers forked from a parent that refuses local pipelines inherit the flag
+    registry.set_local_pipelines(True)
+    registry.disable_processor_cache()
+    registry.warmup(profiles)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def analyze_requirements_task(requirements_text: str, profile: str, context: Optional[str] = None) -> RequirementsAnalysisOutput:
+    return registry.get_nlp_processor(profile).analyze_requirements(requirements_text, context=context)
+
+
+def analyze_many_task(requirements_texts: List[str], profile: str, batch_size: int) -> List[RequirementsAnalysisOutput]:
+    return registry.get_nlp_processor(profile).analyze_many(requirements_texts, batch_size=batch_size)
+
+
+def _slices(items: list, count: int) -> List[list]:
+    """items split into at most count contiguous, near-equal, non-empty slices."""
+    count = max(1, min(count, len(items)))
+    size, extra = divmod(len(items), count)
+    slices, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        slices.append(items[start:end])
+        start = end
+    return slices
+
+
+# --- Lifecycle ---
+
+def _warm_profiles() -> List[str]:
+    return list(dict.fromkeys(CPU_PRELOAD_PROFILES))
+
+
+def start(preload: bool = True):
+    """
+    Create the executors. With preload, every process worker is started (running its
+    initializer, which loads the models) or, in thread mode, the shared models are built.
+    """
+    global _cpu_executor, _io_executor
+
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=IO_EXECUTOR_WORKERS, thread_name_prefix="blocking-io")
+
+    if _cpu_executor is not None or CPU_EXECUTOR == "inline":
+        return
+
+    if CPU_EXECUTOR == "process":
+        print(f"Starting NLP process pool with {CPU_EXECUTOR_WORKERS} worker(s), preloading {', '.join(_warm_profiles())}...")
+        registry.set_local_pipelines(False)
+        _cpu_executor = ProcessPoolExecutor(
+            max_workers=CPU_EXECUTOR_WORKERS,
+            mp_context=multiprocessing.get_context(CPU_EXECUTOR_START_METHOD),
+            initializer=_init_cpu_worker,
+            initargs=(_warm_profiles(),)
+        )
+        if preload:
+            # Force every worker to start (and run its initializer) before traffic arrives
+            wait([_cpu_executor.submit(_ping) for _ in range(CPU_EXECUTOR_WORKERS)])
+    elif CPU_EXECUTOR == "thread":
+        _cpu_executor = ThreadPoolExecutor(max_workers=CPU_EXECUTOR_WORKERS, thread_name_prefix="cpu")
+        if preload:
+            registry.warmup(_warm_profiles())
+    else:
+        raise ValueError(f"Unknown CPU_EXECUTOR '{CPU_EXECUTOR}'. Use 'process', 'thread' or 'inline'.")
+
+
+def shutdown():
+    global _cpu_executor, _io_executor
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=True, cancel_futures=True)
+        _cpu_executor = None
+        registry.set_local_pipelines(True)
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=True, cancel_futures=True)
+        _io_executor = None
+
+
+def status() -> dict:
+    return {
+        "cpu_executor": CPU_EXECUTOR,
+        "cpu_workers": CPU_EXECUTOR_WORKERS,
+        "started": CPU_EXECUTOR == "inline" or _cpu_executor is not None
+    }
+
+
+# --- Async entry points used by the routes ---
+
+async def run_cpu_bound(func: Callable, *args, **kwargs):
+    """Run CPU-heavy work on the CPU executor (picklable top-level callables only in process mode)."""
+    if CPU_EXECUTOR == "inline":
+        return func(*args, **kwargs)
+    if _cpu_executor is None:
+        start(preload=False)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_executor, partial(func, *args, **kwargs))
+
+
+async def run_blocking_io(func: Callable, *args, **kwargs):
+    """Run blocking I/O (database, HTTP clients) on the thread pool."""
+    if _io_executor is None:
+        start(preload=False)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_executor, partial(func, *args, **kwargs))
+
+
+async def analyze_requirements(requirements_text: str, profile: str = DEFAULT_PROFILE, context: Optional[str] = None) -> RequirementsAnalysisOutput:
+    """NLP analysis off the event loop. Cache hits are answered here without a round trip to a worker."""
+    if CPU_EXECUTOR != "process":
+        return await run_cpu_bound(analyze_requirements_task, requirements_text, profile, context)
+
+    cache_key = analysis_cache_key(requirements_text, profile)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        cached.raw_input = requirements_text
+        return cached
+
+    result = await run_cpu_bound(analyze_requirements_task, requirements_text, profile, context)
+    analysis_cache.set(cache_key, result)
+    return result
+
+
+async def analyze_many(requirements_texts: List[str], batch_size: int, profile: str = DEFAULT_PROFILE) -> List[RequirementsAnalysisOutput]:
+    if CPU_EXECUTOR != "process":
+        return await run_cpu_bound(analyze_many_task, requirements_texts, profile, batch_size)
+
+    results = []
+    pending = []
+    for i, text in enumerate(requirements_texts):
+        cached = analysis_cache.get(analysis_cache_key(text, profile))
+        if cached is not None:
+            cached.raw_input = text
+        else:
+            pending.append(i)
+        results.append(cached)
+
+    if pending:
+        # One slice per worker so the batch is spread across the pool's cores
+        slices = _slices([requirements_texts[i] for i in pending], CPU_EXECUTOR_WORKERS)
+        analyzed = await asyncio.gather(*(
+            run_cpu_bound(analyze_many_task, texts, profile, batch_size) for texts in slices
+        ))
+        for i, result in zip(pending, (result for part in analyzed for result in part)):
+            results[i] = result
+            analysis_cache.set(analysis_cache_key(requirements_texts[i], profile), result)
+    return results
+
+
+async def iter_analyze_requirements(
+    requirements_text: str,
+    profile: str = DEFAULT_PROFILE,
+    max_chunk_chars: int = DEFAULT_CHUNK_CHARS
+) -> AsyncIterator[Union[RequirementsChunkAnalysis, RequirementsStreamSummary]]:
+    """
+    Analyze a large document chunk by chunk, yielding each chunk's results as soon as
+    it is done and a document summary at the end. Only one chunk is parsed at a time.
+    """
+    assembler = ChunkedAnalysis()
+    for chunk in chunk_text(requirements_text, max_chunk_chars):
+        result = await analyze_requirements(chunk, profile)
+        yield assembler.add(result)
+    yield assembler.finish()
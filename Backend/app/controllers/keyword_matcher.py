@@ -0,0 +1,92 @@
+"""
+Multi-keyword substring matcher (Aho-Corasick automaton).
+
+Keyword tables are compiled once into a single automaton; a single pass over a
+text then reports every keyword it contains, grouped by category. Matching is
+plain substring matching, i.e. the same semantics as `keyword in text`, so the
+cost per text stays flat no matter how many keywords are registered.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    Usage:
+        matcher = KeywordMatcher()
+        matcher.add_keywords("nfr:performance", ["latency", "throughput"])
+        matcher.build()
+        hits = matcher.find("low latency is required")  # {"nfr:performance": {"latency"}}
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminals: List[List[Tuple[str, str]]] = [[]]
+        self._outputs: List[List[Tuple[str, str]]] = [[]]
+        self._built = False
+
+    def add_keyword(self, category: str, keyword: str):
+        """Register a keyword under a category. Matching is case-sensitive; lowercase both sides."""
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminals.append([])
+            state = next_state
+        if (keyword, category) not in self._terminals[state]:
+            self._terminals[state].append((keyword, category))
+        self._built = False
+
+    def add_keywords(self, category: str, keywords: Iterable[str]):
+        for keyword in keywords:
+            self.add_keyword(category, keyword)
+
+    def build(self) -> "KeywordMatcher":
+        """Compute failure links (breadth-first) and merge outputs along them."""
+        self._outputs = [list(terminals) for terminals in self._terminals]
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def find(self, text: str) -> Dict[str, Set[str]]:
+        """Return {category: {keywords found in text}} in a single pass over text."""
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        hits: Dict[str, Set[str]] = {}
+
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                for keyword, category in outputs[state]:
+                    hits.setdefault(category, set()).add(keyword)
+
+        return hits
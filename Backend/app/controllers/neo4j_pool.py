@@ -0,0 +1,173 @@
+"""
+Async Neo4j access for the recommendation path.
+
+Wraps a neo4j AsyncDriver with explicit pool settings and instruments session
+acquisition: a semaphore sized to the pool bounds concurrent sessions, so the
+time spent waiting on it is the pool wait time, and the number of sessions
+currently held is the active-connection count. Both are exposed by metrics()
+for tuning NEO4J_MAX_POOL_SIZE under load.
+
+The pool also tracks a readiness state like registry.Resource (not_loaded ->
+ready | failed): verify() and every completed session mark it ready, a lost
+connection marks it failed, so it can be registered for the /ready endpoint.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from neo4j import AsyncGraphDatabase
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+NEO4J_KEEP_ALIVE = os.getenv("NEO4J_KEEP_ALIVE", "true").lower() == "true"
+NEO4J_MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+# Idle connections older than this are health-checked before reuse
+NEO4J_LIVENESS_CHECK_TIMEOUT = float(os.getenv("NEO4J_LIVENESS_CHECK_TIMEOUT", "30"))
+
+_WAIT_SAMPLES = 1024
+
+
+def _percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class AsyncNeo4jPool:
+    def __init__(self, uri: Optional[str], user: Optional[str], password: Optional[str],
+                 max_pool_size: int = NEO4J_MAX_POOL_SIZE,
+                 acquisition_timeout: float = NEO4J_ACQUISITION_TIMEOUT,
+                 name: str = "neo4j", required: bool = True):
+        self.name = name
+        self.required = required
+        self.uri = uri
+        self.auth = (user, password)
+        self.max_pool_size = max_pool_size
+        self.acquisition_timeout = acquisition_timeout
+        self._driver = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.active_sessions = 0
+        self.peak_active_sessions = 0
+        self.acquisitions = 0
+        self.acquisition_timeouts = 0
+        self.reconnects = 0
+        self._wait_ms = deque(maxlen=_WAIT_SAMPLES)
+
+        self.state = "not_loaded"
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.load_seconds: Optional[float] = None
+
+    def driver(self):
+        if self._driver is None:
+            self._driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=self.auth,
+                max_connection_pool_size=self.max_pool_size,
+                connection_acquisition_timeout=self.acquisition_timeout,
+                keep_alive=NEO4J_KEEP_ALIVE,
+                max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
+                liveness_check_timeout=NEO4J_LIVENESS_CHECK_TIMEOUT
+            )
+        return self._driver
+
+    @asynccontextmanager
+    async def session(self, **kwargs) -> AsyncIterator[Any]:
+        """Async session from the pool; waits (up to acquisition_timeout) while all slots are in use."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pool_size)
+
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquisition_timeout)
+        except asyncio.TimeoutError:
+            self.acquisition_timeouts += 1
+            raise
+        self._wait_ms.append((time.perf_counter() - start) * 1000)
+        self.acquisitions += 1
+        self.active_sessions += 1
+        self.peak_active_sessions = max(self.peak_active_sessions, self.active_sessions)
+        try:
+            async with self.driver().session(**kwargs) as session:
+                yield session
+        except (ServiceUnavailable, SessionExpired) as e:
+            self._set_failed(e)
+            raise
+        else:
+            if self.state != "ready":
+                self.state = "ready"
+                self.error = None
+        finally:
+            self.active_sessions -= 1
+            self._slots.release()
+
+    async def verify(self):
+        """Check connectivity now (used by the startup warmup); raises if Neo4j is unreachable."""
+        self.attempts += 1
+        start = time.perf_counter()
+        try:
+            await self.driver().verify_connectivity()
+        except Exception as e:
+            self._set_failed(e)
+            print(f"Error: could not initialize {self.name}. {e}")
+            raise
+        self.load_seconds = round(time.perf_counter() - start, 3)
+        self.state = "ready"
+        self.error = None
+        print(f"Neo4j connection successful ({self.load_seconds:.2f}s).")
+
+    def _set_failed(self, error: Exception):
+        self.state = "failed"
+        self.error = str(error)
+
+    async def reset(self, reason: Optional[str] = None):
+        """Drop the current driver (and its connections); the next session() reconnects."""
+        driver, self._driver = self._driver, None
+        self.reconnects += 1
+        if reason:
+            self.state = "failed"
+            self.error = reason
+        if driver is not None:
+            try:
+                await driver.close()
+            except Exception as e:
+                print(f"Warning: error while closing Neo4j async driver. {e}")
+
+    async def close(self):
+        driver, self._driver = self._driver, None
+        self.state = "not_loaded"
+        if driver is not None:
+            await driver.close()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "error": self.error,
+            "attempts": self.attempts,
+            "load_seconds": self.load_seconds
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        samples = list(self._wait_ms)
+        return {
+            "connected": self._driver is not None,
+            "max_pool_size": self.max_pool_size,
+            "active_sessions": self.active_sessions,
+            "peak_active_sessions": self.peak_active_sessions,
+            "acquisitions": self.acquisitions,
+            "acquisition_timeouts": self.acquisition_timeouts,
+            "reconnects": self.reconnects,
+            "pool_wait_ms": {
+                "p50": round(_percentile(samples, 50), 3),
+                "p95": round(_percentile(samples, 95), 3),
+                "max": round(max(samples), 3) if samples else 0.0
+            }
+        }
@@ -0,0 +1,161 @@
+"""
+Shared component registry.
+Heavy components (spaCy pipelines, RAG models and connections) are built once per
+worker process, either on first use or during an explicit warmup at application
+startup, and shared by every router. Other resources are registered as Resource
+objects so their state can be reported by the readiness endpoint.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app.controllers.NLP_Processor import NLPProcessor, DEFAULT_PROFILE
+
+# Profile used by the interactive /chat/ask path
+CHAT_NLP_PROFILE = os.getenv("CHAT_NLP_PROFILE", "fast")
+
+_nlp_processors: Dict[str, NLPProcessor] = {}
+_lock = threading.Lock()
+# False in a parent process that hands all NLP work to a process pool (see executors.start)
+_local_pipelines = True
+# False in process pool workers: the parent process owns the analysis cache
+_processor_cache = True
+
+
+def set_local_pipelines(allowed: bool):
+    """Allow or refuse building spaCy pipelines in this process."""
+    global _local_pipelines
+    _local_pipelines = allowed
+
+
+def disable_processor_cache():
+    """Build processors without the analysis cache (in process pool workers)."""
+    global _processor_cache
+    _processor_cache = False
+    for processor in _nlp_processors.values():
+        processor.cache = None
+
+
+def get_nlp_processor(profile: str = DEFAULT_PROFILE) -> NLPProcessor:
+    """Return the shared NLPProcessor for a profile, building it on first use."""
+    processor = _nlp_processors.get(profile)
+    if processor is not None:
+        return processor
+
+    with _lock:
+        processor = _nlp_processors.get(profile)
+        if processor is None:
+            if not _local_pipelines:
+                raise RuntimeError(f"NLP pipeline '{profile}' requested in a process that delegates NLP to the process pool.")
+            print(f"Loading NLP pipeline (profile: {profile})...")
+            processor = NLPProcessor(profile=profile)
+            if not _processor_cache:
+                processor.cache = None
+            _nlp_processors[profile] = processor
+    return processor
+
+
+def warmup(profiles: Optional[Iterable[str]] = None):
+    """Build the processors for the given profiles (default: every profile the routers use)."""
+    for profile in profiles or dict.fromkeys([DEFAULT_PROFILE, CHAT_NLP_PROFILE]):
+        get_nlp_processor(profile)
+
+
+def loaded_profiles() -> list:
+    return list(_nlp_processors.keys())
+
+
+class ResourceUnavailable(RuntimeError):
+    """Raised when a resource failed to initialize (and is not due for a retry yet)."""
+
+
+class Resource:
+    """
+    A lazily initialized shared resource with a tracked state:
+    not_loaded -> loading -> ready | failed.
+    A failed resource is retried on the next get() once retry_seconds have passed,
+    and reset() drops a broken instance so the next get() reconnects.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any], closer: Optional[Callable[[Any], None]] = None,
+                 retry_seconds: float = 30.0, required: bool = True):
+        self.name = name
+        self.required = required
+        self.retry_seconds = retry_seconds
+        self._loader = loader
+        self._closer = closer
+        self._lock = threading.Lock()
+        self._value = None
+        self.state = "not_loaded"
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.load_seconds: Optional[float] = None
+        self._last_attempt = 0.0
+        register_resource(self)
+
+    def get(self) -> Any:
+        if self.state == "ready":
+            return self._value
+
+        with self._lock:
+            if self.state == "ready":
+                return self._value
+            if self.state == "failed" and time.monotonic() - self._last_attempt < self.retry_seconds:
+                raise ResourceUnavailable(f"{self.name} is unavailable: {self.error}")
+
+            self.state = "loading"
+            self.attempts += 1
+            self._last_attempt = time.monotonic()
+            start = time.perf_counter()
+            try:
+                self._value = self._loader()
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                print(f"Error: could not initialize {self.name}. {e}")
+                raise ResourceUnavailable(f"{self.name} is unavailable: {e}") from e
+
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self.state = "ready"
+            self.error = None
+            print(f"{self.name} ready in {self.load_seconds:.2f}s")
+            return self._value
+
+    def reset(self, reason: Optional[str] = None):
+        """Close and drop the current instance; the next get() initializes it again."""
+        with self._lock:
+            value, self._value = self._value, None
+            self.state = "not_loaded"
+            self.error = reason
+        if value is not None and self._closer:
+            try:
+                self._closer(value)
+            except Exception as e:
+                print(f"Warning: error while closing {self.name}. {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "error": self.error,
+            "attempts": self.attempts,
+            "load_seconds": self.load_seconds
+        }
+
+
+_resources: Dict[str, Any] = {}
+
+
+def register_resource(resource: Any):
+    """Track a Resource, or any object with the same name / required / state / status() attributes."""
+    _resources[resource.name] = resource
+
+
+def resource_status() -> Dict[str, Dict[str, Any]]:
+    return {name: resource.status() for name, resource in _resources.items()}
+
+
+def is_ready() -> bool:
+    return all(resource.state == "ready" for resource in _resources.values() if resource.required)
@@ -0,0 +1,64 @@
+"""
+Coalescing of identical in-flight requests (single flight).
+
+While a call for a key is running, further calls with the same key do not start
+their own execution: they wait on the first one and receive its result (or its
+exception). The key is forgotten as soon as the call finishes, so this only
+de-duplicates concurrent work (double clicks, client retries) and never serves
+stale results; caching is left to the caches of the individual stages.
+
+The shared execution runs as its own task, so a caller that disconnects (and is
+cancelled) does not cancel the work other callers are waiting for.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict
+
+from app.controllers.analysis_cache import normalize_text
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(*parts: Any) -> str:
+    """Hash of the JSON-serializable parts, with whitespace in every string collapsed."""
+    canonical = json.dumps(_normalize(list(parts)), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._stats = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func() for key, or join the execution already in flight for it."""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self._stats["executions"] += 1
+        else:
+            self._stats["coalesced"] += 1
+            print(f"[{self.name}] Joining identical request already in flight.")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._calls.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller has gone away
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._calls)}
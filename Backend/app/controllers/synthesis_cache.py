@@ -0,0 +1,197 @@
+"""
+Persistent cache for Stage 3 (Gemini) architecture reports.
+
+Two lookups, in order:
+    exact     a hash of the Gemini model and the whitespace-compacted synthesis
+              prompt sent to Gemini, i.e. of every input the report is generated from
+    semantic  (optional, off by default) same Gemini model, identical Stage 2
+              results and session context, and functional / non-functional /
+              constraint texts whose joint embedding is at least
+              similarity_threshold cosine-similar to those of a cached report
+
+Entries live in a local SQLite file (SYNTHESIS_CACHE_PATH, relative to the
+Backend directory) so they survive restarts and are shared by worker
+processes. Entries older than ttl_seconds are ignored and purged; beyond
+max_entries the least recently used are evicted.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.controllers.analysis_cache import normalize_text
+
+SYNTHESIS_CACHE_ENABLED = os.getenv("SYNTHESIS_CACHE", "true").lower() == "true"
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SYNTHESIS_CACHE_PATH = os.path.join(BACKEND_DIR, os.getenv("SYNTHESIS_CACHE_PATH", "synthesis_cache.sqlite3"))
+SYNTHESIS_CACHE_TTL_SECONDS = int(os.getenv("SYNTHESIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SYNTHESIS_CACHE_MAX_ENTRIES = int(os.getenv("SYNTHESIS_CACHE_MAX_ENTRIES", "2000"))
+SYNTHESIS_CACHE_SEMANTIC = os.getenv("SYNTHESIS_CACHE_SEMANTIC", "false").lower() == "true"
+# Minimum cosine similarity between requirement embeddings for a semantic hit
+SYNTHESIS_CACHE_SIMILARITY = float(os.getenv("SYNTHESIS_CACHE_SIMILARITY", "0.95"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS synthesis (
+    exact_key TEXT PRIMARY KEY,
+    semantic_key TEXT,
+    requirements_vector BLOB,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS synthesis_semantic ON synthesis (semantic_key);
+CREATE INDEX IF NOT EXISTS synthesis_last_used ON synthesis (last_used);
+"""
+
+
+def _sha256(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SynthesisCache:
+    def __init__(self, path: str = SYNTHESIS_CACHE_PATH, ttl_seconds: int = SYNTHESIS_CACHE_TTL_SECONDS,
+                 max_entries: int = SYNTHESIS_CACHE_MAX_ENTRIES, similarity_threshold: float = SYNTHESIS_CACHE_SIMILARITY):
+        """
+        Args:
+            path: SQLite database file (created on first use)
+            ttl_seconds: Seconds before an entry expires
+            max_entries: Entries kept on disk (least recently used are evicted)
+            similarity_threshold: Minimum requirements cosine similarity for a semantic hit
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def exact_key(prompt: str, model_name: str) -> str:
+        return _sha256(model_name, normalize_text(prompt))
+
+    @staticmethod
+    def semantic_key(dkb_results: dict, session_context: dict, model_name: str, embedding_fingerprint: str) -> str:
+        """Only reports built from identical DKB results and session context can match semantically."""
+        return _sha256(
+            model_name,
+            embedding_fingerprint,
+            json.dumps(dkb_results, sort_keys=True, separators=(",", ":")),
+            json.dumps(session_context, sort_keys=True, separators=(",", ":"), default=str)
+        )
+
+    def _db(self) -> sqlite3.Connection:
+        # Caller holds the lock
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def get(self, exact_key: str, semantic_key: Optional[str] = None,
+            requirements_vector: Optional[np.ndarray] = None) -> Optional[str]:
+        """Cached report for the exact key, else the closest semantic match above the threshold, else None."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT response FROM synthesis WHERE exact_key = ? AND created_at > ?",
+                (exact_key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is not None:
+                self._touch(db, exact_key, now)
+                self._stats["exact_hits"] += 1
+                return row[0]
+
+            if semantic_key is not None and requirements_vector is not None:
+                best_key, best_response, best_score = None, None, self.similarity_threshold
+                query = np.asarray(requirements_vector, dtype=np.float32)
+                for key, vector, response in db.execute(
+                    "SELECT exact_key, requirements_vector, response FROM synthesis "
+                    "WHERE semantic_key = ? AND requirements_vector IS NOT NULL AND created_at > ?",
+                    (semantic_key, now - self.ttl_seconds)
+                ):
+                    candidate = np.frombuffer(vector, dtype=np.float32)
+                    if candidate.shape != query.shape:
+                        continue
+                    score = float(candidate @ query)
+                    if score >= best_score:
+                        best_key, best_response, best_score = key, response, score
+                if best_key is not None:
+                    self._touch(db, best_key, now)
+                    self._stats["semantic_hits"] += 1
+                    print(f"Synthesis cache: semantic match (similarity {best_score:.3f}).")
+                    return best_response
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, exact_key: str, response: str, semantic_key: Optional[str] = None,
+            requirements_vector: Optional[np.ndarray] = None):
+        now = time.time()
+        vector = np.asarray(requirements_vector, dtype=np.float32).tobytes() if requirements_vector is not None else None
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO synthesis VALUES (?, ?, ?, ?, ?, ?)",
+                    (exact_key, semantic_key, vector, response, now, now)
+                )
+                self._stats["stores"] += 1
+                self._evict(db, now)
+
+    def _touch(self, db: sqlite3.Connection, exact_key: str, now: float):
+        with db:
+            db.execute("UPDATE synthesis SET last_used = ? WHERE exact_key = ?", (now, exact_key))
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        expired = db.execute("DELETE FROM synthesis WHERE created_at <= ?", (now - self.ttl_seconds,)).rowcount
+        overflow = db.execute(
+            "DELETE FROM synthesis WHERE exact_key IN "
+            "(SELECT exact_key FROM synthesis ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (max(self.max_entries, 0),)
+        ).rowcount
+        self._stats["evictions"] += expired + overflow
+
+    def clear(self):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM synthesis")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["exact_hits"] + self._stats["semantic_hits"] + self._stats["misses"]
+            size = self._db().execute("SELECT count(*) FROM synthesis").fetchone()[0]
+            return {
+                **self._stats,
+                "hit_rate": round((lookups - self._stats["misses"]) / lookups, 4) if lookups else 0.0,
+                "size": size,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_threshold": self.similarity_threshold,
+                "path": self.path
+            }
+
+
+# Global synthesis cache instance
+synthesis_cache = SynthesisCache()
@@ -83,6 +83,17 @@ def link_pattern_to_concept(tx, pattern_id, concept_id, rel_type):
     """
     tx.run(query, pid=pattern_id, cid=concept_id)
 
+def stamp_dkb_version(tx):
+    """
+    Writes a new version stamp. Running API instances compare it with their
+    in-memory DKB snapshot (app/controllers/dkb_snapshot.py) and reload.
+    """
+    tx.run("""
+    MERGE (m:DKBMeta {id: 'dkb'})
+    SET m.version = randomUUID(),
+        m.seeded_at = datetime()
+    """)
+
 def clear_database(tx):
     """Deletes all nodes and relationships. Useful for a clean re-seed."""
     tx.run("MATCH (n) DETACH DELETE n")
@@ -147,6 +158,9 @@ def main():
             s.execute_write(link_pattern_to_concept, link["pattern_id"], link["concept_id"], link["rel_type"])
 
         print("All relationships created successfully.")
+
+        # New version stamp: running API instances reload their DKB snapshot
+        s.execute_write(stamp_dkb_version)
         print("\n--- Seeding DKB successfully completed! ---")
 
 if __name__ == "__main__":
@@ -1,5 +1,10 @@
+import asyncio
+import contextlib
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.controllers import executors, RAG
 from app.routes.health import router as health_router
 from app.routes.nlp_routes import router as nlp_router
 from app.routes.context_routes import router as context_router
@@ -7,10 +12,40 @@ from app.routes.chat import router as chat_router
 from app.routes.enhance import router as enhance_router
 from app.routes.issues import router as issues_router
 
+def _log_warmup_result(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Warning: RAG warmup failed. {task.exception()}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the executors and load NLP pipelines before serving; set WARMUP_ON_STARTUP=false to load them on first use
+    executors.start(preload=os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true")
+
+    # RAG_WARMUP: background (serve immediately, load models / connect in a thread),
+    # eager (finish loading before serving) or lazy (load on first request)
+    rag_warmup = os.getenv("RAG_WARMUP", "background").lower()
+    app.state.rag_warmup = None
+    if rag_warmup == "eager":
+        await RAG.warmup_async()
+    elif rag_warmup == "background":
+        # Kept on app.state so the task is not garbage-collected and can be stopped on shutdown
+        app.state.rag_warmup = asyncio.create_task(RAG.warmup_async())
+        app.state.rag_warmup.add_done_callback(_log_warmup_result)
+
+    yield
+    if app.state.rag_warmup is not None and not app.state.rag_warmup.done():
+        app.state.rag_warmup.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await app.state.rag_warmup
+    executors.shutdown()
+    RAG.close()
+    await RAG.close_async()
+
 app = FastAPI(
     title="Advanced SE Architecture Workbench API",
     description="AI-powered architecture recommendation system with context management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # app.middleware("http")
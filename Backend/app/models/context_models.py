@@ -40,13 +40,16 @@ class ContextualRequirementsInput(BaseModel):
     requirements_text: str
     context: Optional[str] = None
     domain: Optional[str] = None
+    # Sentences are only ever added to the session: send True after editing or deleting
+    # earlier sentences so the requirements are rebuilt from requirements_text alone
+    force_new_analysis: bool = False
 
 
 class ContextualArchitectureRequest(BaseModel):
     """Request model for getting architecture recommendation with context"""
     session_id: str
     requirements_text: Optional[str] = None  # Can be omitted if using session context
-    force_new_analysis: bool = False  # Whether to force a new NLP analysis
+    force_new_analysis: bool = False  # Rebuild the session requirements from requirements_text (needed after edits)
 
 
 class SetPersistentConstraint(BaseModel):
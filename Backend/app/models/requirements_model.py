@@ -57,4 +57,37 @@ class RequirementsAnalysisOutput(BaseModel):
 class RequirementsInput(BaseModel):
     requirements_text: str
     context: Optional[str] = None
-    domain: Optional[str] = None
\ No newline at end of file
+    domain: Optional[str] = None
+
+class BatchRequirementsInput(BaseModel):
+    documents: List[RequirementsInput] = Field(..., min_length=1)
+    batch_size: Optional[int] = Field(None, ge=1, le=1000)
+
+class BatchRequirementsAnalysisOutput(BaseModel):
+    results: List[RequirementsAnalysisOutput]
+    count: int
+
+class StreamingRequirementsInput(RequirementsInput):
+    max_chunk_chars: Optional[int] = Field(None, ge=500, le=200000)
+    format: str = Field("ndjson", pattern="^(ndjson|sse)$")
+
+class RequirementsChunkAnalysis(BaseModel):
+    type: str = "chunk"
+    chunk_index: int
+    functional_requirements: List[FunctionalRequirement]
+    non_functional_requirements: List[NonFunctionalRequirement]
+    constraints: List[Constraint]
+    business_rules: List[BusinessRule] = []
+    actors: List[str] = []
+    entities: List[Entity] = []
+    relationships: List[Relationship] = []
+    technologies_mentioned: List[str] = []
+
+class RequirementsStreamSummary(BaseModel):
+    type: str = "summary"
+    chunks: int
+    summary: str
+    actors: List[str] = []
+    technologies_mentioned: List[str] = []
+    counts: Dict[str, int] = {}
+    confidence: float = Field(ge=0.0, le=1.0)
@@ -1,14 +1,16 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Any, Dict
-from app.controllers.NLP_Processor import NLPProcessor
-from app.controllers import RAG
+from app.controllers.registry import CHAT_NLP_PROFILE
+from app.controllers import RAG, executors
+from app.controllers.singleflight import SingleFlight, request_key
 # from app.controllers import Reasoning_engine
 
 router = APIRouter(prefix="/chat", tags=["chat"])
-
-# instantiate heavy components once
-_nlp_processor = NLPProcessor()
+# Duplicate /chat/ask requests (double clicks, client retries) share one NLP + RAG run
+ask_flight = SingleFlight("chat/ask")
 
 class AskRequest(BaseModel):
     query: str
@@ -33,23 +35,33 @@ def _serialize(obj: Any):
     except Exception:
         return str(obj)
 
-@router.post("/ask")
-async def ask(payload: AskRequest):
+async def _analyze(payload: AskRequest) -> dict:
     if not payload.query or not payload.query.strip():
         raise HTTPException(status_code=400, detail="query is required")
-    # 1) NLP analysis
     try:
-        nlp_output = _nlp_processor.analyze_requirements(payload.query, context=payload.context)
+        nlp_output = await executors.analyze_requirements(payload.query, profile=CHAT_NLP_PROFILE, context=payload.context)
         nlp_json = _serialize(nlp_output)
         # ensure raw_input and summary exist
         nlp_json.setdefault("raw_input", payload.query)
         nlp_json.setdefault("summary", nlp_json.get("summary") or payload.query[:200])
+        return nlp_json
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"NLP processing failed: {e}")
 
+def _sse_event(event_type: str, payload: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+
+@router.post("/ask")
+async def ask(payload: AskRequest):
+    return await ask_flight.do(request_key(payload.query, payload.context), lambda: _ask(payload))
+
+async def _ask(payload: AskRequest):
+    # 1) NLP analysis
+    nlp_json = await _analyze(payload)
+
     # 2) RAG / Architecture recommendation
     try:
-        recommendation = RAG.get_architecture_recommendation(nlp_json)
+        recommendation = await RAG.get_architecture_recommendation_async(nlp_json)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Architecture recommendation failed: {e}")
 
@@ -63,4 +75,24 @@ async def ask(payload: AskRequest):
     return {
         "nlp": nlp_json,
         "recommendation": recommendation
-    }
\ No newline at end of file
+    }
+
+@router.post("/ask/stream")
+async def ask_stream(payload: AskRequest):
+    """
+    /chat/ask as Server-Sent Events: an "nlp" event with the analysis, then
+    "chunk" events with the recommendation text as it is generated, then "done".
+    """
+    nlp_json = await _analyze(payload)
+
+    async def event_stream():
+        yield _sse_event("nlp", nlp_json)
+        try:
+            async for chunk in RAG.stream_architecture_recommendation(nlp_json):
+                yield _sse_event("chunk", {"text": chunk})
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Architecture recommendation failed: {e}"})
+            return
+        yield _sse_event("done", {})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
@@ -3,10 +3,13 @@ API routes for context management
 Handles session creation, message history, and contextual interactions
 """
 
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.controllers.context_manager import context_manager
-from app.controllers.NLP_Processor import NLPProcessor
-from app.controllers.RAG import get_architecture_recommendation
+from app.controllers import executors
+from app.controllers.NLP_Processor import split_sentences
+from app.controllers.RAG import get_architecture_recommendation_async, stream_architecture_recommendation
 from app.models.context_models import (
     SessionCreate,
     SessionResponse,
@@ -24,12 +27,49 @@ from app.models.context_models import (
     CleanupResponse
 )
 from app.models.requirements_model import RequirementsAnalysisOutput
-from typing import Optional
+from typing import Optional, Dict, Any
 
 router = APIRouter(prefix="/api/context", tags=["Context Management"])
 
-# Initialize NLP processor
-nlp_processor = NLPProcessor()
+
+async def _analyze_into_session(
+    session_id: str,
+    requirements_text: str,
+    context: Optional[str] = None,
+    force_new_analysis: bool = False
+) -> Dict[str, Any]:
+    """
+    Analyze only the sentences of requirements_text that the session has not seen before,
+    merge the result into the session requirements and return the merged requirements.
+
+    Requirements are only ever added: a follow-up message usually carries just the new
+    sentences, so a sentence missing from requirements_text is not taken as removed. When a
+    client edits or deletes earlier sentences it must send the whole text with
+    force_new_analysis, which drops the session requirements and analyzes it from scratch.
+    """
+    if force_new_analysis:
+        context_manager.reset_requirements(session_id)
+    
+    session = context_manager.get_session(session_id)
+    new_sentences = context_manager.get_new_sentences(session_id, split_sentences(requirements_text))
+    
+    if new_sentences or not session.current_requirements:
+        result = await executors.analyze_requirements(
+            requirements_text=" ".join(new_sentences) or requirements_text,
+            context=context
+        )
+        result_dict = result.dict()
+    else:
+        # Nothing new in this message; only persistent context can change
+        result_dict = {}
+    result_dict["raw_input"] = requirements_text
+    
+    # Merge with persistent context, then into the session requirements
+    merged_result = context_manager.merge_with_persistent_context(session_id, result_dict)
+    context_manager.update_requirements(session_id, merged_result)
+    context_manager.mark_sentences_analyzed(session_id, new_sentences)
+    
+    return dict(session.current_requirements)
 
 
 @router.post("/sessions", response_model=SessionResponse)
@@ -144,6 +184,7 @@ async def analyze_requirements_with_context(input_data: ContextualRequirementsIn
     """
     Analyze requirements with session context
     Maintains conversation history and merges with persistent constraints
+    Send force_new_analysis after editing earlier requirements (see _analyze_into_session)
     """
     try:
         # Get session
@@ -166,23 +207,14 @@ async def analyze_requirements_with_context(input_data: ContextualRequirementsIn
         if input_data.context:
             full_context += f"\n\nAdditional Context:\n{input_data.context}"
         
-        result = nlp_processor.analyze_requirements(
-            requirements_text=input_data.requirements_text,
-            context=full_context
-        )
-        
-        # Convert to dict for merging
-        result_dict = result.dict()
-        
-        # Merge with persistent context
-        merged_result = context_manager.merge_with_persistent_context(
+        # Only new or changed sentences are analyzed; results are merged into the session
+        merged_result = await _analyze_into_session(
             input_data.session_id,
-            result_dict
+            input_data.requirements_text,
+            context=full_context,
+            force_new_analysis=input_data.force_new_analysis
         )
         
-        # Update session with new requirements
-        context_manager.update_requirements(input_data.session_id, merged_result)
-        
         # Store NLP analysis in history
         context_manager.add_nlp_analysis(input_data.session_id, merged_result)
         
@@ -206,6 +238,75 @@ async def analyze_requirements_with_context(input_data: ContextualRequirementsIn
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+async def _prepare_recommendation_input(input_data: ContextualArchitectureRequest) -> Dict[str, Any]:
+    """Requirements (new or stored) plus conversation context for the RAG pipeline"""
+    # Get session
+    session = context_manager.get_session(input_data.session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    
+    # If new requirements provided, analyze them first
+    if input_data.requirements_text:
+        # Add user message
+        context_manager.add_message(
+            session_id=input_data.session_id,
+            role="user",
+            content=input_data.requirements_text
+        )
+        
+        # Build context
+        conversation_context = context_manager.build_context_for_llm(input_data.session_id)
+        full_context = f"{conversation_context}\n\nCurrent Request:\n{input_data.requirements_text}"
+        
+        # Perform NLP analysis on new sentences and update session
+        merged_result = await _analyze_into_session(
+            input_data.session_id,
+            input_data.requirements_text,
+            context=full_context,
+            force_new_analysis=input_data.force_new_analysis
+        )
+        context_manager.add_nlp_analysis(input_data.session_id, merged_result)
+    else:
+        # Use existing requirements from session
+        if not session.current_requirements:
+            raise HTTPException(
+                status_code=400, 
+                detail="No requirements found in session. Please provide requirements_text."
+            )
+        merged_result = dict(session.current_requirements)
+    
+    # Build context for LLM
+    llm_context = context_manager.build_context_for_llm(input_data.session_id)
+    
+    # Add context to the merged result for RAG processing
+    merged_result["llm_context"] = llm_context
+    merged_result["conversation_history"] = context_manager.get_conversation_history(
+        input_data.session_id, 
+        last_n=6
+    )
+    return merged_result
+
+
+def _store_recommendation(session_id: str, merged_result: Dict[str, Any], recommendation: str):
+    # Store recommendation in session
+    recommendation_data = {
+        "recommendation_text": recommendation,
+        "based_on_requirements": merged_result.get("summary", "N/A")
+    }
+    context_manager.add_architecture_recommendation(
+        session_id,
+        recommendation_data
+    )
+    
+    # Add assistant message to history
+    context_manager.add_message(
+        session_id=session_id,
+        role="assistant",
+        content=recommendation[:500] + "...",  # Truncate for history
+        metadata={"type": "architecture_recommendation", "full_length": len(recommendation)}
+    )
+
+
 @router.post("/architecture-recommendation")
 async def get_contextual_architecture_recommendation(input_data: ContextualArchitectureRequest):
     """
@@ -213,84 +314,16 @@ async def get_contextual_architecture_recommendation(input_data: ContextualArchi
     Uses conversation history and persistent constraints
     """
     try:
-        # Get session
-        session = context_manager.get_session(input_data.session_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found or expired")
-        
-        # If new requirements provided, analyze them first
-        if input_data.requirements_text:
-            # Add user message
-            context_manager.add_message(
-                session_id=input_data.session_id,
-                role="user",
-                content=input_data.requirements_text
-            )
-            
-            # Build context
-            conversation_context = context_manager.build_context_for_llm(input_data.session_id)
-            full_context = f"{conversation_context}\n\nCurrent Request:\n{input_data.requirements_text}"
-            
-            # Perform NLP analysis
-            nlp_result = nlp_processor.analyze_requirements(
-                requirements_text=input_data.requirements_text,
-                context=full_context
-            )
-            
-            # Merge with persistent context
-            nlp_result_dict = nlp_result.dict()
-            merged_result = context_manager.merge_with_persistent_context(
-                input_data.session_id,
-                nlp_result_dict
-            )
-            
-            # Update session
-            context_manager.update_requirements(input_data.session_id, merged_result)
-            context_manager.add_nlp_analysis(input_data.session_id, merged_result)
-        else:
-            # Use existing requirements from session
-            if not session.current_requirements:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="No requirements found in session. Please provide requirements_text."
-                )
-            merged_result = session.current_requirements
-        
-        # Build context for LLM
-        llm_context = context_manager.build_context_for_llm(input_data.session_id)
-        
-        # Add context to the merged result for RAG processing
-        merged_result["llm_context"] = llm_context
-        merged_result["conversation_history"] = context_manager.get_conversation_history(
-            input_data.session_id, 
-            last_n=6
-        )
+        merged_result = await _prepare_recommendation_input(input_data)
         
         # Get architecture recommendation from RAG system
-        recommendation = get_architecture_recommendation(merged_result)
-        
-        # Store recommendation in session
-        recommendation_data = {
-            "recommendation_text": recommendation,
-            "based_on_requirements": merged_result.get("summary", "N/A")
-        }
-        context_manager.add_architecture_recommendation(
-            input_data.session_id,
-            recommendation_data
-        )
-        
-        # Add assistant message to history
-        context_manager.add_message(
-            session_id=input_data.session_id,
-            role="assistant",
-            content=recommendation[:500] + "...",  # Truncate for history
-            metadata={"type": "architecture_recommendation", "full_length": len(recommendation)}
-        )
+        recommendation = await get_architecture_recommendation_async(merged_result)
+        _store_recommendation(input_data.session_id, merged_result, recommendation)
         
         return {
             "session_id": input_data.session_id,
             "recommendation": recommendation,
-            "context_used": llm_context,
+            "context_used": merged_result["llm_context"],
             "based_on_requirements": merged_result.get("summary", "N/A")
         }
         
@@ -300,6 +333,42 @@ async def get_contextual_architecture_recommendation(input_data: ContextualArchi
         raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
 
 
+@router.post("/architecture-recommendation/stream")
+async def stream_contextual_architecture_recommendation(input_data: ContextualArchitectureRequest):
+    """
+    Streaming variant of /architecture-recommendation (Server-Sent Events).
+    Emits "chunk" events with the recommendation text as it is generated and a
+    final "done" event; the full recommendation is stored in the session once complete.
+    """
+    try:
+        merged_result = await _prepare_recommendation_input(input_data)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
+
+    async def event_stream():
+        chunks = []
+        try:
+            async for chunk in stream_architecture_recommendation(merged_result):
+                chunks.append(chunk)
+                yield _sse_event("chunk", {"text": chunk})
+            _store_recommendation(input_data.session_id, merged_result, "".join(chunks))
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"Recommendation failed: {str(e)}"})
+            return
+        yield _sse_event("done", {
+            "session_id": input_data.session_id,
+            "based_on_requirements": merged_result.get("summary", "N/A")
+        })
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+def _sse_event(event_type: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+
+
 @router.post("/persistent-constraints")
 async def set_persistent_constraint(constraint_data: SetPersistentConstraint):
     """
@@ -1,7 +1,27 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+
+from app.controllers import executors, registry, RAG
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness_check(response: Response):
+    """State of every shared resource; 503 until all required ones are ready."""
+    ready = registry.is_ready()
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "resources": registry.resource_status(),
+        "executors": executors.status()
+    }
+
+
+@router.get("/metrics")
+async def metrics():
+    """Neo4j pool wait / active sessions and embedding cache / batcher counters."""
+    return RAG.metrics()
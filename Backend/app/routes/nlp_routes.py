@@ -1,18 +1,26 @@
+import json
 from fastapi import APIRouter, HTTPException
-from app.models.requirements_model import RequirementsInput, RequirementsAnalysisOutput
-from app.controllers.NLP_Processor import NLPProcessor
+from fastapi.responses import StreamingResponse
+from app.models.requirements_model import (
+    RequirementsInput,
+    RequirementsAnalysisOutput,
+    BatchRequirementsInput,
+    BatchRequirementsAnalysisOutput,
+    StreamingRequirementsInput
+)
+from app.controllers.NLP_Processor import DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_CHARS
+from app.controllers import executors
+from app.controllers.analysis_cache import analysis_cache
 
 router = APIRouter(prefix="/api/nlp", tags=["NLP Analysis"])
 
-nlp_processor = NLPProcessor()
-
 @router.post("/analyze-requirements", response_model=RequirementsAnalysisOutput)
 async def analyze_requirements(input_data: RequirementsInput):
     """
     Analyze user requirements and extract structured information
     """
     try:
-        result = nlp_processor.analyze_requirements(
+        result = await executors.analyze_requirements(
             requirements_text=input_data.requirements_text,
             context=input_data.context
         )
@@ -20,6 +28,51 @@ async def analyze_requirements(input_data: RequirementsInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.post("/analyze-requirements/batch", response_model=BatchRequirementsAnalysisOutput)
+async def analyze_requirements_batch(input_data: BatchRequirementsInput):
+    """
+    Analyze many requirement documents in one call.
+    Results are returned in the same order as the submitted documents.
+    """
+    try:
+        results = await executors.analyze_many(
+            [doc.requirements_text for doc in input_data.documents],
+            batch_size=input_data.batch_size or DEFAULT_BATCH_SIZE
+        )
+        return BatchRequirementsAnalysisOutput(results=results, count=len(results))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch analysis failed: {str(e)}")
+
+@router.post("/analyze-requirements/stream")
+async def analyze_requirements_stream(input_data: StreamingRequirementsInput):
+    """
+    Analyze a large document in section-aware chunks and stream partial results.
+    Emits one "chunk" event per chunk (IDs continue across chunks) and a final "summary" event,
+    as NDJSON lines or Server-Sent Events depending on `format`.
+    """
+    async def event_stream():
+        try:
+            async for event in executors.iter_analyze_requirements(
+                input_data.requirements_text,
+                max_chunk_chars=input_data.max_chunk_chars or DEFAULT_CHUNK_CHARS
+            ):
+                yield _format_event(event.type, event.model_dump_json(), input_data.format)
+        except Exception as e:
+            yield _format_event("error", json.dumps({"type": "error", "detail": f"Analysis failed: {str(e)}"}), input_data.format)
+
+    media_type = "text/event-stream" if input_data.format == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type)
+
+def _format_event(event_type: str, data: str, stream_format: str) -> str:
+    if stream_format == "sse":
+        return f"event: {event_type}\ndata: {data}\n\n"
+    return f"{data}\n"
+
+@router.get("/cache/stats")
+async def analysis_cache_stats():
+    """Hit/miss counters and size of the NLP analysis cache"""
+    return analysis_cache.stats()
+
 @router.get("/health")
 async def nlp_health():
     """Health check for NLP service"""
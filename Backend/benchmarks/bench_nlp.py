@@ -0,0 +1,207 @@
+"""
+Benchmark suite for NLPProcessor on the checked-in corpus.
+
+Times analyze_requirements end to end and every extraction stage on its own,
+reporting throughput (docs/s, tokens/s), p50/p95 latency and peak memory.
+Results can be saved as a baseline and later runs compared against it.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_nlp --repeat 20
+    python -m benchmarks.bench_nlp --profile fast
+    python -m benchmarks.bench_nlp --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_nlp --compare benchmarks/baseline.json --threshold 10
+
+Corpus files are named <size>_<domain>.txt (small / medium / large). With
+--compare the exit code is 1 when any p50 latency regresses by more than
+--threshold percent, so the run can gate a CI job.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+from app.controllers.NLP_Processor import NLPProcessor, PIPELINE_PROFILES, DEFAULT_PROFILE
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Stage name -> callable(processor, context). The context is prepared once per
+# document outside the timing so each stage is measured in isolation.
+STAGES = {
+    "spacy_pipeline": lambda p, c: p.nlp(c["text"]),
+    "sentence_features": lambda p, c: p._build_sentence_features(c["doc"]),
+    "summary": lambda p, c: p._generate_summary(c["doc"], c["sentences"]),
+    "functional_requirements": lambda p, c: p._extract_functional_requirements(c["sentences"]),
+    "non_functional_requirements": lambda p, c: p._extract_non_functional_requirements(c["sentences"]),
+    "constraints": lambda p, c: p._extract_constraints(c["sentences"]),
+    "actors": lambda p, c: p._extract_actors(c["doc"], c["sentences"]),
+    "entities": lambda p, c: p._extract_entities(c["doc"]),
+    "relationships": lambda p, c: p._extract_relationships(c["doc"], c["actors"], c["entities"]),
+    "business_rules": lambda p, c: p._extract_business_rules(c["sentences"]),
+    "technologies": lambda p, c: p._extract_technologies(c["doc"], c["text"]),
+}
+
+
+def load_corpus(corpus_dir: str = CORPUS_DIR) -> dict:
+    corpus = {}
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith(".txt"):
+            with open(os.path.join(corpus_dir, name), "r", encoding="utf-8") as f:
+                corpus[name] = f.read()
+    return corpus
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = round(pct / 100 * (len(ordered) - 1))
+    return ordered[min(max(index, 0), len(ordered) - 1)]
+
+
+def time_calls(func, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings: list, tokens: int) -> dict:
+    mean_ms = statistics.fmean(timings)
+    return {
+        "mean_ms": round(mean_ms, 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "docs_per_s": round(1000 / mean_ms, 2) if mean_ms else 0.0,
+        "tokens_per_s": round(tokens * 1000 / mean_ms, 1) if mean_ms else 0.0
+    }
+
+
+def bench_document(processor: NLPProcessor, text: str, repeat: int) -> dict:
+    doc = processor.nlp(text)
+    sentences = processor._build_sentence_features(doc)
+    context = {
+        "text": text,
+        "doc": doc,
+        "sentences": sentences,
+        "actors": processor._extract_actors(doc, sentences),
+        "entities": processor._extract_entities(doc)
+    }
+    tokens = len(doc)
+
+    processor.analyze_requirements(text)  # warm up
+    end_to_end = summarize(time_calls(lambda: processor.analyze_requirements(text), repeat), tokens)
+
+    # Separate untimed run: tracemalloc slows allocation-heavy code considerably
+    tracemalloc.start()
+    processor.analyze_requirements(text)
+    end_to_end["peak_alloc_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+
+    stages = {
+        name: summarize(time_calls(lambda stage=stage: stage(processor, context), repeat), tokens)
+        for name, stage in STAGES.items()
+    }
+    return {
+        "bytes": len(text.encode("utf-8")),
+        "tokens": tokens,
+        "end_to_end": end_to_end,
+        "stages": stages
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print p50 changes against the baseline and return the ones above threshold percent."""
+    regressions = []
+    print(f"\n{'document':<30}{'stage':<30}{'base p50':>10}{'now p50':>10}{'change':>10}")
+    for name, current in results["documents"].items():
+        base = baseline.get("documents", {}).get(name)
+        if not base:
+            print(f"{name:<30}(not in baseline)")
+            continue
+        rows = [("end_to_end", current["end_to_end"], base["end_to_end"])]
+        rows += [(stage, stats, base["stages"][stage])
+                 for stage, stats in current["stages"].items() if stage in base.get("stages", {})]
+        for label, now, then in rows:
+            if then["p50_ms"] <= 0:
+                continue
+            change = (now["p50_ms"] - then["p50_ms"]) / then["p50_ms"] * 100
+            print(f"{name:<30}{label:<30}{then['p50_ms']:>10.2f}{now['p50_ms']:>10.2f}{change:>+9.1f}%")
+            if change > threshold:
+                regressions.append(f"{name} / {label}: {then['p50_ms']:.2f} ms -> {now['p50_ms']:.2f} ms ({change:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NLPProcessor on the benchmark corpus")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per document and stage")
+    parser.add_argument("--profile", choices=list(PIPELINE_PROFILES), default=DEFAULT_PROFILE,
+                        help="NLP pipeline profile to benchmark")
+    parser.add_argument("--corpus", default=CORPUS_DIR, help="Directory of .txt requirement documents")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as JSON to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="Compare p50 latencies with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Allowed p50 regression in percent before --compare fails")
+    args = parser.parse_args()
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    # Cache disabled so every timed run does the full analysis
+    processor = NLPProcessor(profile=args.profile, cache=None)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"profile={args.profile} pipes={processor.nlp.pipe_names}")
+    print(f"load {load_ms:.0f} ms, peak RSS {rss_before:.0f} MB -> {peak_rss_mb():.0f} MB\n")
+
+    results = {
+        "profile": args.profile,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "load_ms": round(load_ms, 1),
+        "documents": {}
+    }
+
+    print(f"{'document':<30}{'tokens':>8}{'p50 ms':>10}{'p95 ms':>10}{'docs/s':>10}{'tokens/s':>12}{'peak KB':>10}")
+    for name, text in load_corpus(args.corpus).items():
+        result = bench_document(processor, text, args.repeat)
+        results["documents"][name] = result
+        e2e = result["end_to_end"]
+        print(f"{name:<30}{result['tokens']:>8}{e2e['p50_ms']:>10.2f}{e2e['p95_ms']:>10.2f}"
+              f"{e2e['docs_per_s']:>10.1f}{e2e['tokens_per_s']:>12.0f}{e2e['peak_alloc_kb']:>10.0f}")
+        for stage, stats in result["stages"].items():
+            print(f"    {stage:<34}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+
+    results["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    print(f"\npeak RSS after run: {results['peak_rss_mb']:.0f} MB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("profile") != args.profile:
+            print(f"Warning: baseline profile '{baseline.get('profile')}' differs from '{args.profile}'")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold}%:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo p50 regressions above {args.threshold}%.")
+
+
+if __name__ == "__main__":
+    main()
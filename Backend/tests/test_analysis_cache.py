@@ -0,0 +1,44 @@
+import os
+import threading
+
+from app.controllers.analysis_cache import AnalysisCache
+from app.models.requirements_model import FunctionalRequirement, RequirementsAnalysisOutput
+
+
+def result(count):
+    return RequirementsAnalysisOutput(
+        summary="Booking",
+        functional_requirements=[FunctionalRequirement(id=f"FR{i + 1}", text="x" * 200) for i in range(count)],
+        non_functional_requirements=[],
+        constraints=[],
+        actors=[],
+        entities=[],
+        relationships=[],
+        confidence=0.5
+    )
+
+
+def test_key_ignores_whitespace_but_not_namespace():
+    assert AnalysisCache.make_key("a  b\n", "1:full") == AnalysisCache.make_key("a b", "1:full")
+    assert AnalysisCache.make_key("a b", "1:full") != AnalysisCache.make_key("a b", "1:fast")
+
+
+def test_hits_are_copies():
+    cache = AnalysisCache()
+    cache.set("k", result(1))
+    cache.get("k").functional_requirements.clear()
+    assert len(cache.get("k").functional_requirements) == 1
+
+
+def test_concurrent_writes_of_one_key_leave_a_complete_file(tmp_path):
+    writer = AnalysisCache(disk_dir=str(tmp_path))
+    threads = [threading.Thread(target=writer.set, args=("k", result(50 + i))) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert os.listdir(tmp_path) == ["k.json"]
+    reader = AnalysisCache(disk_dir=str(tmp_path))
+    assert 50 <= len(reader.get("k").functional_requirements) < 66
+    assert reader.stats()["disk_hits"] == 1
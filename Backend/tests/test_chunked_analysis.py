@@ -0,0 +1,59 @@
+from app.controllers.NLP_Processor import ChunkedAnalysis
+from app.models.requirements_model import (
+    BusinessRule,
+    Constraint,
+    FunctionalRequirement,
+    NonFunctionalRequirement,
+    RequirementsAnalysisOutput
+)
+
+
+def chunk_result(frs=0, nfrs=0, constraints=0, rules=0, summary="", actors=(), confidence=0.5):
+    """An analysis of one chunk, numbered from 1 like NLPProcessor numbers every document."""
+    return RequirementsAnalysisOutput(
+        summary=summary,
+        functional_requirements=[FunctionalRequirement(id=f"FR{i + 1}", text=f"fr {i}") for i in range(frs)],
+        non_functional_requirements=[
+            NonFunctionalRequirement(id=f"NFR{i + 1}", text=f"nfr {i}", category="performance") for i in range(nfrs)
+        ],
+        constraints=[Constraint(id=f"C{i + 1}", text=f"c {i}", type="technology", value="x") for i in range(constraints)],
+        business_rules=[BusinessRule(id=f"BR{i + 1}", text=f"br {i}", category="policy") for i in range(rules)],
+        actors=list(actors),
+        entities=[],
+        relationships=[],
+        confidence=confidence
+    )
+
+
+def test_ids_continue_across_chunks():
+    assembler = ChunkedAnalysis()
+    first = assembler.add(chunk_result(frs=2, nfrs=1, constraints=1))
+    second = assembler.add(chunk_result(frs=3, rules=2))
+    third = assembler.add(chunk_result(nfrs=2, constraints=1, rules=1))
+
+    assert [fr.id for fr in first.functional_requirements] == ["FR1", "FR2"]
+    assert [fr.id for fr in second.functional_requirements] == ["FR3", "FR4", "FR5"]
+    assert [nfr.id for nfr in third.non_functional_requirements] == ["NFR2", "NFR3"]
+    assert [c.id for c in third.constraints] == ["C2"]
+    assert [br.id for br in second.business_rules + third.business_rules] == ["BR1", "BR2", "BR3"]
+    assert [event.chunk_index for event in (first, second, third)] == [0, 1, 2]
+
+
+def test_summary_aggregates_counts_actors_and_confidence():
+    assembler = ChunkedAnalysis()
+    assembler.add(chunk_result(frs=1, summary="Booking platform", actors=["patient", "doctor"], confidence=0.4))
+    assembler.add(chunk_result(frs=1, summary="Later chunk", actors=["admin", "patient"], confidence=0.8))
+    summary = assembler.finish()
+
+    assert summary.chunks == 2
+    assert summary.summary == "Booking platform"
+    assert summary.actors == ["admin", "doctor", "patient"]
+    assert summary.counts == {"functional_requirements": 2, "non_functional_requirements": 0,
+                              "constraints": 0, "business_rules": 0}
+    assert summary.confidence == 0.6
+
+
+def test_finish_without_chunks():
+    summary = ChunkedAnalysis().finish()
+    assert summary.chunks == 0
+    assert summary.confidence == 0.0
@@ -0,0 +1,81 @@
+import pytest
+
+from app.controllers.context_manager import ContextManager
+
+
+@pytest.fixture
+def manager():
+    return ContextManager()
+
+
+@pytest.fixture
+def session_id(manager):
+    return manager.create_session()
+
+
+def fr(id_, text):
+    return {"id": id_, "text": text, "priority": "medium"}
+
+
+def test_first_update_is_stored_as_is(manager, session_id):
+    requirements = {"summary": "Booking", "functional_requirements": [fr("FR1", "Users can book")]}
+    manager.update_requirements(session_id, requirements)
+    assert manager.get_session(session_id).current_requirements == requirements
+
+
+def test_repeated_texts_are_skipped_and_new_items_renumbered(manager, session_id):
+    manager.update_requirements(session_id, {
+        "summary": "Booking",
+        "functional_requirements": [fr("FR1", "Users can book"), fr("FR2", "Users can cancel"), fr("FR3", "Admins can report")]
+    })
+    manager.update_requirements(session_id, {
+        "summary": "Follow-up",
+        "functional_requirements": [fr("FR1", "  users CAN   book "), fr("FR2", "Users can pay online")]
+    })
+    merged = manager.get_session(session_id).current_requirements
+
+    assert [(item["id"], item["text"]) for item in merged["functional_requirements"]] == [
+        ("FR1", "Users can book"),
+        ("FR2", "Users can cancel"),
+        ("FR3", "Admins can report"),
+        ("FR4", "Users can pay online")
+    ]
+    # The summary of the first analysis is kept
+    assert merged["summary"] == "Booking"
+
+
+def test_actors_entities_and_relationships_are_merged_without_duplicates(manager, session_id):
+    manager.update_requirements(session_id, {
+        "actors": ["patient"],
+        "entities": [{"name": "Appointment", "type": "domain_entity", "attributes": ["date"]}],
+        "relationships": [{"source": "patient", "target": "Appointment", "type": "requests"}]
+    })
+    manager.update_requirements(session_id, {
+        "actors": ["doctor", "patient"],
+        "entities": [{"name": "Appointment", "type": "domain_entity", "attributes": ["date", "room"]}],
+        "relationships": [
+            {"source": "patient", "target": "Appointment", "type": "requests"},
+            {"source": "doctor", "target": "Appointment", "type": "manages"}
+        ]
+    })
+    merged = manager.get_session(session_id).current_requirements
+
+    assert merged["actors"] == ["patient", "doctor"]
+    assert merged["entities"] == [{"name": "Appointment", "type": "domain_entity", "attributes": ["date", "room"]}]
+    assert [r["type"] for r in merged["relationships"]] == ["requests", "manages"]
+
+
+def test_only_unseen_sentences_are_new(manager, session_id):
+    manager.mark_sentences_analyzed(session_id, ["Users can book."])
+    sentences = ["users can  BOOK.", "Users can pay.", "Users can pay."]
+    assert manager.get_new_sentences(session_id, sentences) == ["Users can pay."]
+
+
+def test_reset_forgets_requirements_and_analyzed_sentences(manager, session_id):
+    # What force_new_analysis relies on after a client edits an earlier sentence
+    manager.update_requirements(session_id, {"functional_requirements": [fr("FR1", "Users can book rooms.")]})
+    manager.mark_sentences_analyzed(session_id, ["Users can book rooms."])
+    manager.reset_requirements(session_id)
+
+    assert manager.get_session(session_id).current_requirements is None
+    assert manager.get_new_sentences(session_id, ["Users can book rooms."]) == ["Users can book rooms."]
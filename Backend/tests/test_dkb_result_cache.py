@@ -0,0 +1,34 @@
+from app.controllers.dkb_result_cache import DKBResultCache, concept_signature
+
+
+def test_signature_ignores_order_duplicates_and_missing_buckets():
+    assert concept_signature({"nfrs": ["Scalability", "Security", "Scalability"], "domains": ["Healthcare"]}) == \
+        concept_signature({"domains": ["Healthcare"], "nfrs": ["Security", "Scalability"], "constraints": []})
+    assert concept_signature({"nfrs": ["Scalability"]}) != concept_signature({"constraints": ["Scalability"]})
+
+
+def test_hit_returns_a_copy():
+    cache = DKBResultCache()
+    cache.put("v1", {"nfrs": ["Scalability"]}, {"ranked_patterns": [{"pattern": "A"}]})
+    hit = cache.get("v1", {"nfrs": ["Scalability"]})
+    hit["ranked_patterns"].clear()
+    assert cache.get("v1", {"nfrs": ["Scalability"]}) == {"ranked_patterns": [{"pattern": "A"}]}
+    assert cache.stats()["hits"] == 2
+
+
+def test_new_version_drops_old_entries():
+    cache = DKBResultCache()
+    cache.put("v1", {"nfrs": ["Scalability"]}, {"ranked_patterns": []})
+    assert cache.get("v2", {"nfrs": ["Scalability"]}) is None
+    stats = cache.stats()
+    assert (stats["version"], stats["entries"], stats["invalidations"]) == ("v2", 0, 1)
+    # Switching back does not resurrect the dropped entry
+    assert cache.get("v1", {"nfrs": ["Scalability"]}) is None
+
+
+def test_put_for_a_stale_version_is_ignored():
+    cache = DKBResultCache()
+    cache.get("v2", {})
+    cache.put("v1", {"nfrs": ["Scalability"]}, {"ranked_patterns": []})
+    assert cache.stats()["entries"] == 0
+    assert cache.get("v2", {"nfrs": ["Scalability"]}) is None
@@ -0,0 +1,71 @@
+from app.controllers.dkb_snapshot import DKBSnapshot
+
+
+def pattern(key, cost):
+    return {"key": key, "name": key.upper(), "description": f"{key} pattern", "cost": cost}
+
+
+def edge(pattern_key, rel, concept, label):
+    return {"pattern_key": pattern_key, "rel": rel, "concept_key": f"{label}:{concept}", "concept": concept, "labels": [label]}
+
+
+def snapshot(patterns, edges, stacks=()):
+    return DKBSnapshot.from_rows("v1", patterns, edges, list(stacks))
+
+
+def names(ranked):
+    return [row["pattern"] for row in ranked]
+
+
+def test_fit_score_uses_relationship_weights():
+    snap = snapshot(
+        [pattern("a", 1), pattern("b", 1)],
+        [
+            edge("a", "PROMOTES", "Scalability", "NFR"),
+            edge("a", "SUITS", "Healthcare", "Domain"),
+            edge("a", "MEETS_CONSTRAINT", "Open Source", "Constraint"),
+            edge("b", "PROMOTES", "Scalability", "NFR"),
+            edge("b", "HINDERS", "Low Cost", "NFR")
+        ]
+    )
+    ranked = snap.rank({"nfrs": ["Scalability", "Low Cost"], "domains": ["Healthcare"], "constraints": ["Open Source"]})
+    assert [(row["pattern"], row["fitScore"]) for row in ranked] == [("A", 6), ("B", -3)]
+
+
+def test_ties_order_by_cost_with_null_costs_last_then_graph_order():
+    snap = snapshot(
+        [pattern("free", None), pattern("pricey", 3), pattern("cheap", 1), pattern("unknown", None), pattern("cheap2", 1)],
+        [edge(key, "PROMOTES", "Scalability", "NFR") for key in ("free", "pricey", "cheap", "unknown", "cheap2")]
+    )
+    ranked = snap.rank({"nfrs": ["Scalability"]})
+    assert names(ranked) == ["CHEAP", "CHEAP2", "PRICEY", "FREE", "UNKNOWN"]
+    assert [row["baseCost"] for row in ranked] == [1, 1, 3, None, None]
+
+
+def test_score_outranks_cost():
+    snap = snapshot(
+        [pattern("cheap", 1), pattern("fit", 5)],
+        [edge("fit", "MEETS_CONSTRAINT", "Cloud", "Constraint")]
+    )
+    assert names(snap.rank({"constraints": ["Cloud"]})) == ["FIT", "CHEAP"]
+    assert names(snap.rank({})) == ["CHEAP", "FIT"]
+
+
+def test_edges_to_wrong_label_or_unknown_pattern_are_ignored():
+    snap = snapshot(
+        [pattern("a", 1)],
+        [edge("a", "PROMOTES", "Scalability", "Domain"), edge("zzz", "PROMOTES", "Scalability", "NFR")]
+    )
+    assert snap.rank({"nfrs": ["Scalability"], "domains": ["Scalability"]})[0]["fitScore"] == 0
+
+
+def test_tech_stack_is_a_copy():
+    snap = snapshot(
+        [pattern("a", 1)],
+        [],
+        [{"pattern": "A", "component_type": "Database", "alternatives": [{"name": "PostgreSQL"}]}]
+    )
+    stack = snap.tech_stack("A")
+    stack["Database"].append({"name": "MySQL"})
+    assert snap.tech_stack("A") == {"Database": [{"name": "PostgreSQL"}]}
+    assert snap.tech_stack("missing") == {}
@@ -0,0 +1,89 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.controllers.embedding_batcher import EmbeddingBatcher
+
+
+class FakeEncoder:
+    """Encodes a text as [len(text), index of the call]; fails for batches containing "fail"."""
+    dim = 2
+    fingerprint = "fake"
+    backend = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        if "fail" in texts:
+            raise RuntimeError("encoder failed")
+        return np.array([[len(text), len(self.calls)] for text in texts], dtype=np.float32)
+
+
+def encode_concurrently(batcher, requests):
+    results = [None] * len(requests)
+
+    def run(i):
+        try:
+            results[i] = batcher.encode(requests[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results
+
+
+@pytest.fixture
+def batchers():
+    created = []
+    yield created
+    for batcher in created:
+        batcher.close()
+
+
+def test_concurrent_requests_share_a_batch_and_get_their_own_rows(batchers):
+    encoder = FakeEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=64, max_wait_ms=200)
+    batchers.append(batcher)
+
+    results = encode_concurrently(batcher, [["a"], ["bb", "ccc"], ["dddd"]])
+
+    assert len(encoder.calls) == 1
+    assert [row[0] for result in results for row in result] == [1, 2, 3, 4]
+    assert [len(result) for result in results] == [1, 2, 1]
+
+
+def test_encoder_error_reaches_every_request_of_the_batch(batchers):
+    encoder = FakeEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=64, max_wait_ms=200)
+    batchers.append(batcher)
+
+    results = encode_concurrently(batcher, [["ok"], ["fail"], ["also ok"]])
+
+    assert len(encoder.calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The worker keeps serving after a failed batch
+    assert batcher.encode(["next"])[0][0] == 4
+
+
+def test_oversized_requests_are_not_split(batchers):
+    encoder = FakeEncoder()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=2, max_wait_ms=0)
+    batchers.append(batcher)
+
+    assert batcher.encode(["a", "b", "c"]).shape == (3, 2)
+    assert encoder.calls == [["a", "b", "c"]]
+
+
+def test_empty_request_and_closed_batcher():
+    batcher = EmbeddingBatcher(FakeEncoder())
+    assert batcher.encode([]).shape == (0, 2)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.encode(["a"])
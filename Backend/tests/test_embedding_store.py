@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.controllers import embedding_store
+from app.controllers.dkb_index import ConceptIndex
+
+CONCEPTS = [
+    {"name": "Scalability", "label": "NFR", "description": "Ability to handle increasing load."},
+    {"name": "GDPR", "label": "Constraint", "description": None},
+    {"name": "Healthcare", "label": "Domain", "description": "Hospitals and clinics."}
+]
+
+
+def unit_rows(count, dim=4):
+    matrix = np.random.default_rng(0).normal(size=(count, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_round_trip_memory_maps_matrix_and_concepts(tmp_path):
+    matrix = unit_rows(len(CONCEPTS))
+    embedding_store.save_store(CONCEPTS, matrix, "model", str(tmp_path))
+    store = embedding_store.load_store(str(tmp_path))
+
+    assert isinstance(store.matrix, np.memmap)
+    assert isinstance(store.concepts.records, np.memmap)
+    assert store.concepts[0] == CONCEPTS[0]
+    assert store.concepts[1]["description"] == ""
+    assert [concept["name"] for concept in store.concepts] == ["Scalability", "GDPR", "Healthcare"]
+    assert np.array_equal(store.matrix, matrix)
+    assert store.normalized and store.digest == embedding_store.matrix_digest(matrix)
+
+    # The sidecar only holds the header
+    meta = json.loads((tmp_path / embedding_store.META_FILE).read_text())
+    assert "concepts" not in meta and meta["count"] == 3
+
+
+def test_format_1_sidecar_with_inline_concepts_still_loads(tmp_path):
+    matrix = unit_rows(len(CONCEPTS))
+    np.save(tmp_path / embedding_store.MATRIX_FILE, matrix)
+    meta = {"format_version": 1, "model": "model", "dim": 4, "count": 3, "dtype": "float32",
+            "normalized": True, "concepts": CONCEPTS}
+    (tmp_path / embedding_store.META_FILE).write_text(json.dumps(meta))
+
+    store = embedding_store.load_store(str(tmp_path))
+    assert store.concepts == CONCEPTS
+    assert "concepts" not in store.meta
+
+
+def test_concept_count_mismatch_is_rejected(tmp_path):
+    embedding_store.save_store(CONCEPTS, unit_rows(3), "model", str(tmp_path))
+    np.save(tmp_path / embedding_store.CONCEPTS_FILE, embedding_store.ConceptTable.from_concepts(CONCEPTS[:2]).records)
+    with pytest.raises(ValueError):
+        embedding_store.load_store(str(tmp_path))
+
+
+def test_concept_index_builds_from_store(tmp_path):
+    embedding_store.save_store(CONCEPTS, unit_rows(3), "model", str(tmp_path))
+    index = ConceptIndex.from_store(embedding_store.load_store(str(tmp_path)))
+    assert index.buckets == ["nfrs", "constraints", "domains"]
+    assert index.keyword_matches(["Must comply with GDPR"]) == {"constraints": {"GDPR"}}
@@ -0,0 +1,60 @@
+import random
+
+from app.controllers.keyword_matcher import KeywordMatcher
+
+
+def expected_hits(keywords, text):
+    """The semantics KeywordMatcher replaces: `keyword in text` for every registered keyword."""
+    hits = {}
+    for keyword, category in keywords.items():
+        if keyword in text:
+            hits.setdefault(category, set()).add(keyword)
+    return hits
+
+
+def test_matches_in_semantics_on_random_tables():
+    rng = random.Random(1)
+    for _ in range(300):
+        keywords = {
+            "".join(rng.choice("abc ") for _ in range(rng.randint(1, 5))): rng.choice("xyz")
+            for _ in range(rng.randint(1, 15))
+        }
+        matcher = KeywordMatcher()
+        for keyword, category in keywords.items():
+            matcher.add_keyword(category, keyword)
+        text = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 40)))
+        assert matcher.find(text) == expected_hits(keywords, text)
+
+
+def test_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher()
+    matcher.add_keywords("nfr:performance", ["response time", "time", "fast"])
+    matcher.add_keywords("constraint", ["must use", "use"])
+    text = "the api must use caching for fast response times"
+    assert matcher.find(text) == {
+        "nfr:performance": {"response time", "time", "fast"},
+        "constraint": {"must use", "use"}
+    }
+
+
+def test_substring_not_word_matching():
+    # Same as `"can" in text`: matches inside longer words too
+    matcher = KeywordMatcher()
+    matcher.add_keyword("functional", "can")
+    assert matcher.find("scanning documents") == {"functional": {"can"}}
+    assert matcher.find("nothing here") == {}
+
+
+def test_keyword_in_several_categories_and_rebuild_after_add():
+    matcher = KeywordMatcher()
+    matcher.add_keyword("a", "load")
+    matcher.add_keyword("b", "load")
+    assert matcher.find("high load") == {"a": {"load"}, "b": {"load"}}
+    matcher.add_keyword("c", "high")
+    assert matcher.find("high load") == {"a": {"load"}, "b": {"load"}, "c": {"high"}}
+
+
+def test_empty_keyword_is_ignored():
+    matcher = KeywordMatcher()
+    matcher.add_keyword("x", "")
+    assert matcher.find("anything") == {}
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.controllers.singleflight import SingleFlight, request_key
+
+
+def test_request_key_normalizes_whitespace_and_key_order():
+    assert request_key({"a": "scalable  booking\n", "b": 1}) == request_key({"b": 1, "a": "scalable booking"})
+    assert request_key("a", "b") != request_key("ab")
+
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight = SingleFlight("test")
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "report"
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(3)))
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(main())
+    assert results == ["report"] * 3
+    assert len(calls) == 1
+    assert stats == {"executions": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_exception_reaches_every_caller_and_key_is_released():
+    async def main():
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        # The failed call is not remembered: the next call runs again
+        retried = await flight.do("k", lambda: asyncio.sleep(0, result="ok"))
+        return results, retried, flight.stats()
+
+    results, retried, stats = asyncio.run(main())
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert retried == "ok"
+    assert stats["executions"] == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def main():
+        flight = SingleFlight("test")
+        finished = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            finished.set()
+            return "report"
+
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, finished.is_set()
+
+    assert asyncio.run(main()) == ("report", True)
+
+
+def test_cancelled_shared_work_cancels_waiters():
+    async def main():
+        flight = SingleFlight("test")
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(1)
+
+        waiter = asyncio.ensure_future(flight.do("k", work))
+        await started.wait()
+        flight._calls["k"].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return flight.stats()["in_flight"]
+
+    assert asyncio.run(main()) == 0
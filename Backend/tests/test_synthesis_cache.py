@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from app.controllers import synthesis_cache as synthesis_cache_module
+from app.controllers.synthesis_cache import SynthesisCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(synthesis_cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = SynthesisCache(path=str(tmp_path / "synthesis.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_exact_key_ignores_whitespace_but_not_model():
+    assert SynthesisCache.exact_key("prompt  text\n", "m") == SynthesisCache.exact_key("prompt text", "m")
+    assert SynthesisCache.exact_key("prompt text", "m") != SynthesisCache.exact_key("prompt text", "other")
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache(ttl_seconds=60)
+    cache.set("k", "report")
+    clock.now += 59
+    assert cache.get("k") == "report"
+    clock.now += 2
+    assert cache.get("k") is None
+    # The next write purges the expired entry
+    cache.set("other", "report")
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.set("a", "A")
+    clock.now += 1
+    cache.set("b", "B")
+    clock.now += 1
+    assert cache.get("a") == "A"  # "a" is now more recently used than "b"
+    clock.now += 1
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_survive_reopening(make_cache, clock):
+    make_cache().set("k", "report")
+    assert make_cache().get("k") == "report"
+
+
+def test_semantic_match_needs_same_key_and_similarity(make_cache, clock):
+    cache = make_cache(similarity_threshold=0.95)
+    cache.set("k1", "report", semantic_key="s", requirements_vector=unit([1, 0, 0]))
+
+    assert cache.get("k2", semantic_key="s", requirements_vector=unit([1, 0.1, 0])) == "report"
+    assert cache.get("k3", semantic_key="s", requirements_vector=unit([1, 1, 0])) is None
+    assert cache.get("k4", semantic_key="other", requirements_vector=unit([1, 0, 0])) is None
+    stats = cache.stats()
+    assert (stats["semantic_hits"], stats["misses"]) == (1, 2)